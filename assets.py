@@ -0,0 +1,52 @@
+import os
+import time
+from collections import deque
+import pygame
+
+FONT_DIR = "fonts"
+TITLE_FONT = "KarmaticArcade-6Yrp1.ttf"
+INTRO_WARM_BUDGET_MS = 8  # Time per intro frame spent warming caches
+GAME_WARM_BUDGET_MS = 2  # Time per game frame for whatever the intro did not get to
+
+class AssetManager:
+    # Fonts shared by everything that draws text, so each name and size is
+    # loaded once and text cached per font is shared too, plus a queue of
+    # cache warm-up work run a slice at a time. Warm-ups are generators that
+    # do one small piece of work (render a sprite, build a layer) per step.
+    def __init__(self):
+        self.fonts = {}
+        self.warmups = deque()
+        self.warm_steps = 0
+
+    def font(self, name, size):
+        # name is a file in FONT_DIR, or None for pygame's default font
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            path = os.path.join(FONT_DIR, name) if name else None
+            font = self.fonts[key] = pygame.font.Font(path, size)
+        return font
+
+    def add_warmup(self, steps):
+        self.warmups.append(steps)
+
+    @property
+    def warming(self):
+        return bool(self.warmups)
+
+    def warm(self, budget_ms):
+        # Runs warm-up steps until budget_ms has passed. Returns True once
+        # there is nothing left to warm.
+        deadline = time.perf_counter() + budget_ms / 1000
+        while self.warmups:
+            try:
+                next(self.warmups[0])
+                self.warm_steps += 1
+            except StopIteration:
+                self.warmups.popleft()
+                continue
+            if time.perf_counter() >= deadline:
+                break
+        return not self.warmups
+
+assets = AssetManager()  # Shared by everything that loads fonts or warms caches
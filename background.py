@@ -1,24 +1,42 @@
 import pygame
 import random
 import math
-import time
+from surfacepool import surface_pool
 
 class SpaceBackground:
-    def __init__(self, width, height):
+    def __init__(self, width, height, clock):
         self.width = width
         self.height = height
+        self.clock = clock  # Shared simulation clock
         self.stars = []
         self.galaxies = []
         self.planets = []
+        self.static_layer = None  # Stars, galaxies and planets, pre-rendered once
         self.shooting_star = None
-        self.last_shooting_star_time = time.time()
+        self.last_shooting_star_time = self.seconds()
         self.shooting_star_interval = 11  # 10 minutes in seconds
+        self.generate_scenery()
+        self.comet = None
+        self.last_comet_time = self.seconds()
+        self.comet_interval = 15  # 90 seconds
+
+    def seconds(self):
+        return self.clock.time / 1000
+
+    def generate_scenery(self):
+        self.stars = []
+        self.galaxies = []
+        self.planets = []
         self.generate_stars(200)
         self.generate_galaxies(3)
         self.generate_planets(5)
-        self.comet = None
-        self.last_comet_time = time.time()
-        self.comet_interval = 15  # 90 seconds
+        self.static_layer = None
+
+    def resize(self, width, height):
+        # Lay out new scenery for the new size; the layer is rebuilt on the next draw
+        self.width = width
+        self.height = height
+        self.generate_scenery()
 
     def generate_stars(self, num_stars):
         for _ in range(num_stars):
@@ -64,7 +82,7 @@ class SpaceBackground:
             end_y = start_y + random.randint(-self.height//2, self.height//2)
 
         duration = random.uniform(0.5, 1.5)  # Duration of the shooting star animation
-        start_time = time.time()
+        start_time = self.seconds()
         self.shooting_star = (start_x, start_y, end_x, end_y, start_time, duration)
 
     def generate_comet(self):
@@ -86,10 +104,10 @@ class SpaceBackground:
             end_y = start_y + random.randint(-self.height//2, self.height//2)
 
         duration = random.uniform(2, 3)  # Duration of the comet animation
-        start_time = time.time()
+        start_time = self.seconds()
         self.comet = (start_x, start_y, end_x, end_y, start_time, duration)
 
-    def draw(self, screen):
+    def build_static_layer(self):
         # Create a transparent black surface
         background = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         background.fill((0, 0, 0, 200))  # Transparent black
@@ -119,8 +137,30 @@ class SpaceBackground:
             highlight = (min(planet[3][0] + 30, 255), min(planet[3][1] + 30, 255), min(planet[3][2] + 30, 255))
             pygame.draw.circle(background, highlight, (planet[0] - planet[2]//4, planet[1] - planet[2]//4), planet[2]//4)
 
-        # Draw shooting star
-        current_time = time.time()
+        if pygame.display.get_surface() is not None:
+            background = background.convert_alpha()  # Match the display format for fast blits
+        return background
+
+    def warm(self):
+        # Builds the static layer and the glow surfaces ahead of the first draw
+        if self.static_layer is None:
+            self.static_layer = self.build_static_layer()
+        yield
+        surface_pool.circle(5, (255, 255, 255, 100))
+        surface_pool.circle(10, (255, 200, 100, 100))
+        yield
+
+    def draw(self, screen):
+        # Returns the rectangles that changed since the static layer was built
+        dirty = []
+        if screen.get_size() != (self.width, self.height):
+            self.resize(*screen.get_size())
+        if self.static_layer is None:
+            self.static_layer = self.build_static_layer()
+            dirty.append(screen.get_rect())
+
+        # Draw shooting star, under the static layer like the comet
+        current_time = self.seconds()
         if current_time - self.last_shooting_star_time > self.shooting_star_interval:
             if self.shooting_star is None:
                 self.generate_shooting_star()
@@ -128,7 +168,7 @@ class SpaceBackground:
                 self.shooting_star = None
                 self.last_shooting_star_time = current_time
             else:
-                self.draw_shooting_star(screen, current_time)
+                dirty.append(self.draw_shooting_star(screen, current_time))
 
         # Draw comet
         if current_time - self.last_comet_time > self.comet_interval:
@@ -138,9 +178,10 @@ class SpaceBackground:
                 self.comet = None
                 self.last_comet_time = current_time
             else:
-                self.draw_comet(screen, current_time)
+                dirty.append(self.draw_comet(screen, current_time))
 
-        screen.blit(background, (0, 0))
+        screen.blit(self.static_layer, (0, 0))
+        return dirty
 
     def draw_shooting_star(self, screen, current_time):
         progress = (current_time - self.shooting_star[4]) / self.shooting_star[5]
@@ -158,10 +199,13 @@ class SpaceBackground:
             pygame.draw.circle(screen, (255, 255, 255, alpha), (trail_x, trail_y), 1)
         
         # Add a subtle glow
-        glow_surf = pygame.Surface((10, 10), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surf, (255, 255, 255, 100), (5, 5), 5)
+        glow_surf = surface_pool.circle(5, (255, 255, 255, 100))
         screen.blit(glow_surf, (x - 5, y - 5), special_flags=pygame.BLEND_ADD)
 
+        # The trail reaches back to the start point
+        start_x, start_y = self.shooting_star[0], self.shooting_star[1]
+        return pygame.Rect(min(x, start_x) - 5, min(y, start_y) - 5, abs(x - start_x) + 11, abs(y - start_y) + 11)
+
     def draw_comet(self, screen, current_time):
         progress = (current_time - self.comet[4]) / self.comet[5]
         x = int(self.comet[0] + (self.comet[2] - self.comet[0]) * progress)
@@ -185,6 +229,7 @@ class SpaceBackground:
         pygame.draw.circle(screen, (255, 255, 200), (x, y), 4)  # Brighter, slightly larger head
         
         # Add a glow effect
-        glow_surf = pygame.Surface((20, 20), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surf, (255, 200, 100, 100), (10, 10), 10)
+        glow_surf = surface_pool.circle(10, (255, 200, 100, 100))
         screen.blit(glow_surf, (x - 10, y - 10), special_flags=pygame.BLEND_ADD)
+        return pygame.Rect(x - tail_length - tail_width, y - tail_length - tail_width,
+                           (tail_length + tail_width) * 2, (tail_length + tail_width) * 2)
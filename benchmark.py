@@ -0,0 +1,148 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import time
+import numpy as np
+from simulation import Simulation
+from units import spawn_random_unit
+
+# Each scenario varies one thing against 1000 units and one ship, except
+# anti_grav_10k, which is compared with units_10k: at 1000 units the
+# field's cost is lost in the noise
+SCENARIOS = [
+    {"name": "units_100", "units": 100, "ships": 1},
+    {"name": "units_1k", "units": 1000, "ships": 1},
+    {"name": "units_10k", "units": 10000, "ships": 1},
+    {"name": "ships_10", "units": 1000, "ships": 10},
+    {"name": "ships_100", "units": 1000, "ships": 100},
+    {"name": "anti_grav_10k", "units": 10000, "ships": 1, "anti_grav": True},
+    {"name": "bomb_exploding", "units": 1000, "ships": 1, "bomb": True},
+]
+WARMUP_TICKS = 30
+SEED = 1234
+KEEP_CLEAR = 250  # Units start at least this far from the town centre
+
+def build(scenario):
+    # A mid-game Simulation with the scenario's units spread over the field
+    simulation = Simulation(seed=SEED)
+    town_centre = simulation.town_centre
+    units = simulation.units
+    town_centre.health = town_centre.max_health = 10 ** 9  # The town must outlive the run
+
+    for _ in range(scenario["units"]):
+        i = spawn_random_unit(units)
+        units.speed[i] = simulation.level_manager.get_unit_speed(units.speed[i])
+    n = len(units)
+    rng = np.random.default_rng(SEED)
+    angle = rng.uniform(0, 2 * np.pi, n)
+    distance = rng.uniform(KEEP_CLEAR, simulation.height / 2, n)
+    units.x[:n] = town_centre.x + np.cos(angle) * distance * simulation.width / simulation.height
+    units.y[:n] = town_centre.y + np.sin(angle) * distance
+    units.health[:n] = 10 ** 9  # Keep the population steady while measuring
+    units.grid_dirty = True
+
+    for _ in range(scenario["ships"]):
+        simulation.add_spaceship()
+    if scenario.get("anti_grav"):
+        town_centre.activate_anti_grav()
+    if scenario.get("bomb"):
+        town_centre.place_bomb(town_centre.x - 200, town_centre.y)
+        # Set the bomb off now and hold the explosion open for the whole run;
+        # the fuse place_bomb scheduled would otherwise clear it
+        simulation.scheduler.cancel(town_centre.bomb_event)
+        town_centre.explode_bomb()
+        simulation.scheduler.cancel(town_centre.explosion_event)
+    return simulation
+
+def run(scenario, ticks):
+    simulation = build(scenario)
+    simulation.step(WARMUP_TICKS)
+    start_units = len(simulation.units)
+    simulation.enable_stage_timing()
+    latencies = np.zeros(ticks)
+    start = time.perf_counter()
+    for i in range(ticks):
+        tick_start = time.perf_counter()
+        simulation.tick()
+        latencies[i] = time.perf_counter() - tick_start
+    elapsed = time.perf_counter() - start
+    if scenario.get("bomb") and simulation.town_centre.explosion is None:
+        raise RuntimeError(f"{scenario['name']}: the explosion ended during the run")
+
+    latencies *= 1000
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    return {
+        "units": scenario["units"],
+        "ships": scenario["ships"],
+        "anti_grav": bool(scenario.get("anti_grav")),
+        "bomb": bool(scenario.get("bomb")),
+        "ticks": ticks,
+        "ticks_per_sec": round(ticks / elapsed, 1),
+        "latency_ms": {
+            "mean": round(float(latencies.mean()), 4),
+            "p50": round(float(p50), 4),
+            "p90": round(float(p90), 4),
+            "p99": round(float(p99), 4),
+            "max": round(float(latencies.max()), 4),
+        },
+        "stage_ms": {name: round(seconds * 1000 / ticks, 4) for name, seconds in simulation.stage_times.items()},
+        "start_units": start_units,
+        "end_units": len(simulation.units),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"Compared with {baseline.get('commit')}:")
+    for name, result in results["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old:
+            change = result["ticks_per_sec"] / old["ticks_per_sec"]
+            print(f"  {name:<16} {old['ticks_per_sec']:>10.1f} -> {result['ticks_per_sec']:>10.1f} ticks/s ({change:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation update path")
+    parser.add_argument("--ticks", type=int, default=300, help="measured ticks per scenario")
+    parser.add_argument("--only", nargs="+", metavar="SCENARIO", help="run only these scenarios")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "scenarios": {},
+    }
+    for scenario in SCENARIOS:
+        if args.only and scenario["name"] not in args.only:
+            continue
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = run(scenario, args.ticks)  # Upgrades and level ups print
+        results["scenarios"][scenario["name"]] = result
+        latency = result["latency_ms"]
+        print(f"{scenario['name']:<16} {result['ticks_per_sec']:>10.1f} ticks/s  "
+              f"p50 {latency['p50']:.3f}ms  p99 {latency['p99']:.3f}ms  max {latency['max']:.3f}ms")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# Layers in the order they are drawn
+UNIT_LAYER, SHIP_LAYER = range(2)
+
+class DrawList:
+    # Blits collected over a frame and submitted together with Surface.blits,
+    # so drawing thousands of sprites costs one call instead of one per
+    # sprite. Each layer is drawn in full before the next. Within a layer
+    # commands keep the order they were added in; anything emitting many
+    # commands adds them grouped by sprite.
+    def __init__(self, layers=SHIP_LAYER + 1):
+        self.layers = [[] for _ in range(layers)]
+
+    def add(self, layer, surface, pos):
+        self.layers[layer].append((surface, pos))
+
+    def extend(self, layer, commands):
+        # commands: (surface, position) pairs
+        self.layers[layer].extend(commands)
+
+    def __len__(self):
+        return sum(len(commands) for commands in self.layers)
+
+    def submit(self, screen):
+        # Draws everything, empties the list and returns the rectangles drawn to
+        dirty = []
+        for commands in self.layers:
+            if commands:
+                dirty += screen.blits(commands)
+                commands.clear()
+        return dirty
@@ -1,30 +1,39 @@
 import pygame
 import sys
+from assets import assets, TITLE_FONT, INTRO_WARM_BUDGET_MS
 
 class IntroScreen:
     def __init__(self, screen):
         self.screen = screen
-        self.font_path = "fonts/KarmaticArcade-6Yrp1.ttf"  # Updated font name
-        self.title_font = pygame.font.Font(self.font_path, 72)
-        self.subtitle_font = pygame.font.Font(self.font_path, 36)
+        self.title_font = assets.font(TITLE_FONT, 72)
+        self.subtitle_font = assets.font(TITLE_FONT, 36)
         self.neon_green = (57, 255, 20)
         self.clock = pygame.time.Clock()
         self.blink_timer = 0
         self.blink_interval = 500  # milliseconds
 
+        # The text never changes, so it is rendered once
+        self.title_text = self.title_font.render("IDLE SPACE", True, self.neon_green)
+        self.subtitle_text = self.subtitle_font.render("INSERT COIN", True, self.neon_green)
+        self.subtitle_shown = None  # Subtitle state on the screen, None before the first draw
+
     def draw(self):
+        # Only redraws when the subtitle blinks; the frames in between are
+        # left to warming caches
+        subtitle_shown = self.blink_timer < self.blink_interval
+        if subtitle_shown == self.subtitle_shown:
+            return
+        self.subtitle_shown = subtitle_shown
         self.screen.fill((0, 0, 0))  # Black background
 
         # Draw title
-        title_text = self.title_font.render("IDLE SPACE", True, self.neon_green)
-        title_rect = title_text.get_rect(center=(self.screen.get_width() // 2, self.screen.get_height() // 2 - 50))
-        self.screen.blit(title_text, title_rect)
+        title_rect = self.title_text.get_rect(center=(self.screen.get_width() // 2, self.screen.get_height() // 2 - 50))
+        self.screen.blit(self.title_text, title_rect)
 
         # Draw blinking subtitle
-        if self.blink_timer < self.blink_interval:
-            subtitle_text = self.subtitle_font.render("INSERT COIN", True, self.neon_green)
-            subtitle_rect = subtitle_text.get_rect(center=(self.screen.get_width() // 2, self.screen.get_height() // 2 + 50))
-            self.screen.blit(subtitle_text, subtitle_rect)
+        if subtitle_shown:
+            subtitle_rect = self.subtitle_text.get_rect(center=(self.screen.get_width() // 2, self.screen.get_height() // 2 + 50))
+            self.screen.blit(self.subtitle_text, subtitle_rect)
 
         pygame.display.flip()
 
@@ -43,4 +52,5 @@ class IntroScreen:
                     return  # Exit the intro screen and start the game
 
             self.draw()
+            assets.warm(INTRO_WARM_BUDGET_MS)
             self.update()
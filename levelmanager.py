@@ -8,7 +8,7 @@ class LevelManager:
 
     def update(self, defeated_units):
         self.xp += defeated_units
-        if self.xp >= self.xp_to_next_level:
+        while self.xp >= self.xp_to_next_level:  # Large XP gains can span several levels
             self.level_up()
 
     def level_up(self):
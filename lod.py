@@ -0,0 +1,53 @@
+from units import FULL, DOT
+
+DETAIL_BUDGET_MS = 4.0  # Time per frame unit drawing may take before detail drops
+STEP_DOWN_FRAMES = 10  # Frames in a row over budget before dropping a level
+STEP_UP_FRAMES = 60  # Frames in a row with headroom before raising a level
+HEADROOM = 0.6  # Fraction of the budget the next level up must be expected to fit in
+SMOOTHING = 0.1  # Weight of the newest frame in the per-unit cost averages
+
+class DetailGovernor:
+    # Picks the detail level units are drawn at from how long drawing them
+    # takes. A level is dropped after a run of frames over budget, so a single
+    # slow frame (sprite cache misses, a GC pause) does not count. Each level
+    # keeps a running cost per unit from its latest stint, and the level above
+    # is only restored once it is expected to fit well inside the budget at
+    # the current unit count, so the level does not flicker around the
+    # threshold.
+    def __init__(self, budget_ms=DETAIL_BUDGET_MS):
+        self.budget = budget_ms / 1000
+        self.level = FULL
+        self.costs = [None] * (DOT + 1)  # Seconds per unit at each level
+        self.over = 0
+        self.under = 0
+        self.changes = 0
+
+    def update(self, elapsed, count):
+        # Feed in the time the last unit draw took; returns the level to draw at next
+        if count == 0 or self.budget <= 0:
+            return self.level
+        per_unit = elapsed / count
+        cost = self.costs[self.level]
+        cost = per_unit if cost is None else cost + (per_unit - cost) * SMOOTHING
+        self.costs[self.level] = cost
+
+        above = self.costs[self.level - 1] if self.level > FULL else None
+        if self.level < DOT and elapsed > self.budget:
+            self.over += 1
+            self.under = 0
+            if self.over >= STEP_DOWN_FRAMES:
+                self.set_level(self.level + 1)
+        elif above is not None and above * count < self.budget * HEADROOM:
+            self.under += 1
+            self.over = 0
+            if self.under >= STEP_UP_FRAMES:
+                self.set_level(self.level - 1)
+        else:
+            self.over = self.under = 0
+        return self.level
+
+    def set_level(self, level):
+        self.level = level
+        self.costs[level] = None  # Measured afresh for this stint
+        self.over = self.under = 0
+        self.changes += 1
@@ -1,212 +1,240 @@
 import pygame
+import argparse
+import os
 import random
-from towncentre import TownCentre
-from units import spawn_random_unit
+import time
+from simulation import Simulation
+from simclock import SimClock
+from offline import apply_offline_progress
+from savegame import Autosaver, load_game
+from replay import Recorder, Replayer, replay_headless, MAX_SEED
 from ui import UI
-from levelmanager import LevelManager
-from spaceship import Spaceship
 from background import SpaceBackground  # Import the new background class
 from introscreen import IntroScreen
-
-# Initialize Pygame
-pygame.init()
-
-# Set up the display
+from profiler import FrameProfiler
+from screenupdater import ScreenUpdater
+from lod import DetailGovernor, DETAIL_BUDGET_MS
+from drawlist import DrawList
+from simrunner import SimulationRunner
+from spaceship import emit_ship, draw_laser, warm_ship_sprites, SHIP_SIZE
+from assets import assets, GAME_WARM_BUDGET_MS
+
+# Set up the display size
 WIDTH, HEIGHT = 1200, 900
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Idle Tower Defense")
-
-# Set up the clock
-clock = pygame.time.Clock()
-
-# Create game objects
-background = SpaceBackground(WIDTH, HEIGHT)  # Create the background
-town_centre = TownCentre(WIDTH // 2, HEIGHT // 2)
-ui = UI(WIDTH, HEIGHT, town_centre)  # Pass town_centre to UI
-level_manager = LevelManager()
-
-# Initialize units list
-units = []
-
-# Initialize spaceships list
-spaceships = []
-
-# Unit spawning variables
-base_spawn_interval = 60  # Base frames between spawns
 
-# TODO: Remove this line after testing
-ui.resources = 10000  # Start with 200 resources for testing purposes
+SAVE_FILE = "savegame.bin"
+BAD_SAVE_FILE = SAVE_FILE + ".bad"  # Where an unreadable save is moved
+STARTING_RESOURCES = 10000  # TODO: Remove after testing
+
+def seed_value(text):
+    # Seeds feed numpy's generator and the replay header, which both need 0..MAX_SEED
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {text!r}")
+    if not 0 <= seed <= MAX_SEED:
+        raise argparse.ArgumentTypeError(f"must be between 0 and {MAX_SEED}, got {seed}")
+    return seed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Idle Tower Defense")
+    parser.add_argument("--record", metavar="FILE", help="start a new game and record it to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recording")
+    parser.add_argument("--headless", action="store_true", help="replay without a display, as fast as possible")
+    parser.add_argument("--seed", type=seed_value, help="random seed for a new game or recording")
+    parser.add_argument("--display-mode", choices=["flip", "dirty"], default="flip",
+                        help="present full frames, or only the rectangles that changed")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="frame rate cap for drawing, e.g. 120 or 144 (0 for uncapped); the game itself always runs at its fixed tick rate")
+    parser.add_argument("--detail-budget", type=float, default=DETAIL_BUDGET_MS, metavar="MS",
+                        help="milliseconds per frame for drawing units before their detail drops (0 keeps full detail)")
+    args = parser.parse_args()
+
+    # Options that would otherwise be silently ignored
+    if args.headless and not args.replay:
+        parser.error("--headless only applies to --replay")
+    if args.seed is not None:
+        if args.replay:
+            parser.error("--seed cannot be used with --replay; the recording has its own seed")
+        if not args.record and os.path.exists(SAVE_FILE):
+            parser.error(f"--seed only applies to a new game, and {SAVE_FILE} would be continued; use --record for a seeded game")
+    return args
+
+def start_session(simulation):
+    # Continue from the save if there is one, otherwise start a new game. A
+    # save that cannot be read is moved aside rather than blocking the start.
+    if os.path.exists(SAVE_FILE):
+        try:
+            saved_at = load_game(simulation, SAVE_FILE)
+        except ValueError as error:
+            os.replace(SAVE_FILE, BAD_SAVE_FILE)
+            print(f"Could not load save ({error}); moved it to {BAD_SAVE_FILE} and started a new game")
+            simulation.resources = STARTING_RESOURCES
+            return Autosaver(SAVE_FILE)
+
+        # Catch up on the time the game was closed
+        if time.time() > saved_at:
+            apply_offline_progress(simulation, time.time() - saved_at)
+    else:
+        simulation.resources = STARTING_RESOURCES
+    return Autosaver(SAVE_FILE)
+
+def draw(screen, simulation, runner, background, ui, profiler, governor, draw_list):
+    # Units and ships are drawn from the runner's interpolated snapshots; the
+    # rest reads live state while holding the simulation lock. Returns the
+    # rectangles that changed for dirty-rect updates.
+    town_centre = simulation.town_centre
+    view = runner.view()
+
+    screen.fill((0, 0, 0))  # Clear the screen with black
+    dirty = background.draw(screen)  # Draw the space background
+    profiler.mark("background")
+    with runner.lock:
+        dirty += town_centre.draw(screen)
+    profiler.mark("town_centre")
+    units_start = time.perf_counter()
+    simulation.units.emit_state(draw_list, view.x, view.y, view.type_id, view.beams, governor.level)
+    profiler.mark("units")
+    for size, x, y, angle in zip(view.ship_size, view.ship_x, view.ship_y, view.ship_angle):
+        emit_ship(draw_list, size, x, y, angle)
+    profiler.mark("spaceships")
+    dirty += draw_list.submit(screen)  # Units, then ships on top
+    governor.update(time.perf_counter() - units_start, len(view.x))
+    for start, end in view.lasers:
+        dirty.append(draw_laser(screen, start, end))
+    profiler.mark("blits")
+    with runner.lock:
+        dirty += town_centre.draw_bomb_and_explosion(screen)  # Draw bomb and explosion on top of units
+        profiler.mark("bomb")
+        dirty += ui.draw(screen)
+
+    # Draw bomb cursor if placing
+    if ui.placing_bomb:
+        mouse_pos = pygame.mouse.get_pos()
+        dirty.append(ui.draw_missile(screen, mouse_pos, 20, 128))
+    profiler.mark("ui")
+
+    dirty += profiler.draw(screen)
+    profiler.mark("overlay")
+    return dirty
 
 def main():
-    # Create the intro screen
-    intro_screen = IntroScreen(screen)
-
-    # Run the intro screen
-    intro_screen.run()
-
-    # Initialize game variables
-    spawn_timer = 0
-
-    # Main game loop
+    args = parse_args()
+    if args.replay and args.headless:
+        replay_headless(args.replay, WIDTH, HEIGHT)
+        return
+
+    # Initialize Pygame
+    pygame.init()
+
+    # Set up the display
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Idle Tower Defense")
+
+    # Set up the clocks: the pygame clock caps rendering, the simulation clock
+    # paces the fixed-length game ticks run on the simulation thread
+    clock = pygame.time.Clock()
+    sim_clock = SimClock(time_source=pygame.time.get_ticks)
+
+    # Create game objects. Recordings and replays always start a new game
+    # from a seed and leave the save file alone.
+    recorder = replayer = autosaver = None
+    if args.replay:
+        replayer = Replayer(args.replay)
+        simulation = Simulation(WIDTH, HEIGHT, sim_clock, replayer.seed)
+        replayer.start(simulation)
+    elif args.record:
+        seed = args.seed if args.seed is not None else random.getrandbits(63)
+        simulation = Simulation(WIDTH, HEIGHT, sim_clock, seed)
+        simulation.resources = STARTING_RESOURCES
+        recorder = Recorder(args.record, simulation)
+    else:
+        simulation = Simulation(WIDTH, HEIGHT, sim_clock, args.seed)
+        autosaver = start_session(simulation)
+    background = SpaceBackground(WIDTH, HEIGHT, sim_clock)  # Create the background
+    ui = UI(WIDTH, HEIGHT, simulation)
+    profiler = FrameProfiler(simulation)  # F3 toggles frame timing, F4 dumps it
+    screen_updater = ScreenUpdater(screen, args.display_mode)
+    governor = DetailGovernor(args.detail_budget)  # Drops unit detail when drawing runs long
+    draw_list = DrawList()  # Unit and ship sprites, submitted once per frame
+    runner = SimulationRunner(simulation, replayer, recorder)  # Ticks the game on its own thread
+
+    # Caches to fill while the intro screen idles, most visible first
+    assets.add_warmup(background.warm())
+    assets.add_warmup(simulation.town_centre.warm())
+    assets.add_warmup(ui.warm())
+    assets.add_warmup(simulation.units.warm())
+    assets.add_warmup(warm_ship_sprites(SHIP_SIZE))
+
+    if not replayer:
+        # Create the intro screen
+        intro_screen = IntroScreen(screen)
+
+        # Run the intro screen
+        intro_screen.run()
+
+    # Main game loop; the game runs on the simulation thread from here on
+    runner.start()
     running = True
     while running:
-        current_time = pygame.time.get_ticks()
+        profiler.begin_frame()
 
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-        
-            # Handle UI events
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                with runner.lock:
+                    profiler.toggle()
+                screen_updater.invalidate()  # Clear the overlay when it closes
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and profiler.enabled:
+                profiler.dump(time.strftime("frame_times_%Y%m%d_%H%M%S.csv"))
+
+            # Handle UI events; a replay supplies its own actions
+            if replayer:
+                continue
             action = ui.handle_event(event)
             if action:
-                if action == "Upgrade Harvesting":
-                    if ui.upgrade_harvesting():
-                        print(f"Harvesting Upgraded - Level: {ui.harvesting_level}")
-                        for unit in units:
-                            unit.value += 1  # Increase the value of all existing units
-                    # ... (other action handling)
-
-                elif action == "Upgrade Laser":
-                    if ui.resources >= 50:
-                        ui.update_resources(-50)
-                        town_centre.upgrade_laser()
-                        print(f"Laser Upgraded - Level: {town_centre.laser_level}, Damage: {town_centre.laser_damage}, Frequency: {1000/town_centre.laser_cooldown:.2f} shots/second")
-                    else:
-                        print("Not enough resources to upgrade Laser")
-
-                elif isinstance(action, tuple) and action[0] == "Place Bomb":
-                    if ui.resources >= town_centre.bomb_cost:
-                        ui.update_resources(-town_centre.bomb_cost)
-                        town_centre.place_bomb(*action[1])
-                        print(f"Bomb Placed - Cost: {town_centre.bomb_cost}")
-                    else:
-                        print("Not enough resources to place Bomb")
-
-                elif action == "Upgrade Bomb":
-                    if ui.resources >= 100:
-                        ui.update_resources(-100)
-                        town_centre.upgrade_bomb()
-                        print(f"Bomb Upgraded - Level: {town_centre.bomb_upgrade_level}, Damage: {town_centre.bomb_damage_amount}, Radius: {town_centre.bomb_radius}")
-                    else:
-                        print("Not enough resources to upgrade Bomb")
-
-                elif action == "Upgrade Health":
-                    if ui.resources >= 100:
-                        ui.update_resources(-100)
-                        health_regen = town_centre.upgrade_health()
-                        print(f"Health Upgraded - Max Health: {town_centre.max_health}, "
-                              f"Current Health: {town_centre.health}, "
-                              f"Health Regen: {health_regen} per 2 seconds")
-                    else:
-                        print("Not enough resources to upgrade Health")
-
-                elif action.startswith("Cannot Afford"):
-                    print(action)  # You might want to show this message to the player in the UI
-
-                elif action == "Activate AntiGrav":
-                    if ui.resources >= 50 and not town_centre.anti_grav_active:
-                        ui.update_resources(-50)
-                        town_centre.activate_anti_grav()
-                        print("AntiGrav Activated")
-                    elif town_centre.anti_grav_active:
-                        print("AntiGrav is already active")
-                    else:
-                        print("Not enough resources to activate AntiGrav")
-
-                elif action == "Upgrade AntiGrav":
-                    if ui.resources >= 50 and town_centre.anti_grav_active:
-                        ui.update_resources(-50)
-                        town_centre.upgrade_anti_grav()
-                        print(f"AntiGrav Upgraded - Level: {town_centre.anti_grav_level}, Slow: {town_centre.anti_grav_slow*100:.1f}%, Radius: {town_centre.anti_grav_radius}")
-                    elif not town_centre.anti_grav_active:
-                        print("AntiGrav needs to be activated first")
-                    else:
-                        print("Not enough resources to upgrade AntiGrav")
-
-                elif action == "Spawn Spaceship":
-                    if ui.resources >= 200:
-                        ui.update_resources(-200)
-                        spaceships.append(Spaceship(WIDTH, HEIGHT, town_centre))
-                        print("Spaceship spawned")
-
-                elif action == "Upgrade Spaceship":
-                    if ui.resources >= 100 and spaceships:
-                        ui.update_resources(-100)
-                        for ship in spaceships:
-                            ship.upgrade()
-                        print("Spaceships upgraded")
-
-        # Spawn new units
-        spawn_timer += 1
-        spawn_interval = level_manager.get_spawn_interval(base_spawn_interval)
-        if spawn_timer >= spawn_interval:
-            new_unit = spawn_random_unit(WIDTH, HEIGHT, town_centre)
-            new_unit.speed = level_manager.get_unit_speed(new_unit.speed)
-            units.append(new_unit)
-            spawn_timer = 0
-
-        # Update units
-        for unit in units[:]:
-            slow_factor = town_centre.apply_anti_grav(unit)
-            unit.speed *= slow_factor  # Apply slow effect
-            unit.update()
-            unit.speed /= slow_factor  # Reset speed for next frame
-
-        # Update spaceships
-        for ship in spaceships:
-            ship.update(units, current_time, spaceships)  # Pass the list of spaceships
-
-        # Update game objects
-        town_centre.update(units, current_time)
-        defeated_units = 0
-        for unit in units[:]:  # Use a copy of the list to safely remove items
-            unit.update()
-            if unit.collides_with(town_centre):
-                town_centre.take_damage(unit.damage)
-                ui.update_resources(unit.value)
-                units.remove(unit)
-                defeated_units += 1
-            elif unit.health <= 0:
-                ui.update_resources(unit.value)
-                units.remove(unit)
-                defeated_units += 1
-
-        # Apply bomb damage if explosion is active
-        if town_centre.explosion:
-            town_centre.bomb_damage(units)
-
-        # Update level manager
-        level_manager.update(defeated_units)
-        ui.update_level(level_manager.level)
-
-        # Check game over condition
-        if town_centre.health <= 0:
+                runner.submit(action)  # Applied, and recorded, before the next tick
+        profiler.mark("events")
+
+        # Stop once the town falls or the replay ends
+        if runner.finished:
             running = False
 
+        if autosaver:
+            with runner.lock:
+                autosaver.update(simulation)
+        profiler.mark("autosave")
+
+        # Finish warming caches if the intro was skipped or cut short
+        if assets.warming:
+            with runner.lock:
+                assets.warm(GAME_WARM_BUDGET_MS)
+        profiler.mark("warmup")
+
         # Draw everything
-        screen.fill((0, 0, 0))  # Clear the screen with black
-        background.draw(screen)  # Draw the space background
-        town_centre.draw(screen)
-        for unit in units:
-            unit.draw(screen)
-        for ship in spaceships:
-            ship.draw(screen, current_time)  # Pass current_time to draw method
-        town_centre.draw_bomb_and_explosion(screen)  # Draw bomb and explosion on top of units
-        ui.draw(screen)
-
-        # Draw bomb cursor if placing
-        if ui.placing_bomb:
-            mouse_pos = pygame.mouse.get_pos()
-            ui.draw_missile(screen, mouse_pos, 20, 128)
+        dirty = draw(screen, simulation, runner, background, ui, profiler, governor, draw_list)
 
         # Update the display
-        pygame.display.flip()
+        screen_updater.present(dirty)
+        profiler.mark("flip")
 
         # Cap the frame rate
-        clock.tick(60)
-
-    # Quit the game
+        clock.tick(args.fps)
+        profiler.mark("wait")
+        profiler.end_frame()
+
+    # Quit the game, keeping the save unless the town fell
+    runner.stop()
+    if recorder:
+        recorder.close()
+    elif replayer:
+        replayer.report()
+    elif simulation.game_over:
+        autosaver.discard()
+    else:
+        autosaver.close(simulation)
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+import time
+from units import UNIT_TYPES
+
+SIMULATE_BUDGET = 0.25  # Wall-clock seconds to spend simulating before extrapolating
+SIMULATE_CHUNK = 60  # Ticks between budget checks
+
+def apply_offline_progress(simulation, elapsed_seconds, budget=SIMULATE_BUDGET):
+    # Advance the game by the time it was closed. The start of the gap is
+    # simulated tick by tick at full speed; whatever the time budget does not
+    # cover is filled in analytically from the rates seen while simulating.
+    # Offline time never ends the game, simulated or not: health bottoms out
+    # at 1.
+    clock = simulation.clock
+    total_ticks = int(elapsed_seconds * clock.tick_rate)
+    level_manager = simulation.level_manager
+    town_centre = simulation.town_centre
+    start_level = level_manager.level
+    start_resources = simulation.resources
+    start_health = town_centre.health
+
+    # Simulate at maximum speed within the budget, tallying what happened
+    defeated = 0
+    reward = 0
+    damage_taken = 0
+    simulated = 0
+    deadline = time.perf_counter() + budget
+    while simulated < total_ticks and time.perf_counter() < deadline:
+        for _ in range(min(SIMULATE_CHUNK, total_ticks - simulated)):
+            health = town_centre.health
+            simulation.tick()
+            defeated += simulation.defeated_units
+            reward += simulation.reward
+            damage_taken += max(0, health - town_centre.health)
+            simulated += 1
+            if simulation.game_over:
+                town_centre.health = 1
+                simulation.game_over = False
+
+    # Extrapolate the rest of the gap
+    remaining = total_ticks - simulated
+    if remaining > 0:
+        if defeated:
+            reward_per_defeat = reward / defeated
+            damage_per_defeat = damage_taken / defeated
+        else:
+            reward_per_defeat = sum(t.value for t in UNIT_TYPES) / len(UNIT_TYPES)
+            damage_per_defeat = 0
+        extrapolate(simulation, remaining, reward_per_defeat, damage_per_defeat)
+
+    summary = {
+        'simulated_ticks': simulated,
+        'extrapolated_ticks': max(remaining, 0),
+        'levels_gained': level_manager.level - start_level,
+        'resources_gained': simulation.resources - start_resources,
+        'health_lost': start_health - town_centre.health,
+    }
+    print(f"Offline Progress - {elapsed_seconds:.0f}s away, Levels: +{summary['levels_gained']}, "
+          f"Resources: +{summary['resources_gained']}, Health lost: {summary['health_lost']}")
+    return summary
+
+def extrapolate(simulation, ticks, reward_per_defeat, damage_per_defeat):
+    # In steady state every spawned unit is eventually defeated, so defeats
+    # arrive at the spawn rate. The spawn rate changes with level, so walk
+    # the gap one level at a time. Health bottoms out at 1.
+    level_manager = simulation.level_manager
+    town_centre = simulation.town_centre
+    defeated = 0
+    remaining = ticks
+    while remaining > 0:
+        interval = level_manager.get_spawn_interval(simulation.base_spawn_interval)
+        to_next_level = level_manager.xp_to_next_level - level_manager.xp
+        level_ticks = min(remaining, to_next_level * interval)
+        kills = level_ticks // interval
+        level_manager.update(kills)
+        defeated += kills
+        remaining -= level_ticks
+
+    simulation.update_resources(int(defeated * reward_per_defeat))
+    elapsed_ms = ticks * 1000 // simulation.clock.tick_rate
+    regen = town_centre.health_regen * (elapsed_ms // town_centre.regen_interval)
+    health = town_centre.health - int(defeated * damage_per_defeat) + regen
+    town_centre.health = max(1, min(health, town_centre.max_health))
+    simulation.clock.advance(ticks)
@@ -0,0 +1,100 @@
+import time
+import numpy as np
+from assets import assets
+
+# Main loop stages, in the order they run each frame. The simulation runs
+# on its own thread, so it is not one of them.
+FRAME_STAGES = [
+    "events", "autosave", "warmup", "background", "town_centre", "units",
+    "spaceships", "blits", "bomb", "ui", "overlay", "flip", "wait",
+]
+
+class FrameProfiler:
+    # Per-stage frame times in a fixed-size ring buffer. mark() closes a stage
+    # by timing the span since the previous mark, so stages need no nesting.
+    # The sim.* columns come from the simulation's own stage timers and are
+    # measured on the simulation thread: they show how much tick work was
+    # done during each frame, run alongside it, and do not add up to the
+    # frame time. While disabled every call returns straight away.
+    def __init__(self, simulation, capacity=600):
+        self.simulation = simulation
+        self.stages = FRAME_STAGES + ["sim." + name for name, _ in simulation.stages]
+        self.columns = {name: i for i, name in enumerate(self.stages)}
+        self.sim_columns = [self.columns["sim." + name] for name, _ in simulation.stages]
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, len(self.stages) + 1))  # Seconds; last column is the whole frame
+        self.frames = 0  # Frames recorded since enabling
+        self.enabled = False
+        self.row = None  # Buffer row of the frame being recorded
+        self.frame_start = 0
+        self.last_mark = 0
+        self.sim_totals = None
+        self.font = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.frames = 0
+            self.simulation.enable_stage_timing()
+            self.font = assets.font(None, 18)
+        else:
+            self.simulation.disable_stage_timing()
+        self.row = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.row = self.buffer[self.frames % self.capacity]
+        self.row[:] = 0
+        self.sim_totals = list(self.simulation.stage_times.values())
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def mark(self, stage):
+        if self.row is None:
+            return
+        now = time.perf_counter()
+        self.row[self.columns[stage]] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        if self.row is None:
+            return
+        row = self.row
+        for column, total, before in zip(self.sim_columns, self.simulation.stage_times.values(), self.sim_totals):
+            row[column] = total - before
+        row[-1] = self.last_mark - self.frame_start
+        self.frames += 1
+
+    def recorded(self):
+        # Recorded rows, oldest first
+        if self.frames < self.capacity:
+            return self.buffer[:self.frames]
+        return np.roll(self.buffer, -(self.frames % self.capacity), axis=0)
+
+    def draw(self, screen):
+        # Returns the rectangles drawn to
+        if self.row is None or self.frames == 0:
+            return []
+        data = self.recorded() * 1000
+        means = data.mean(axis=0)
+        p50, p99 = np.percentile(data[:, -1], [50, 99])
+        lines = [f"Frame p50 {p50:.2f}ms  p99 {p99:.2f}ms  ({len(data)} frames)"]
+        for name, mean in zip(self.stages, means):
+            if name == self.stages[len(FRAME_STAGES)]:
+                lines.append("simulation thread (not in frame time):")
+            indent = "    " if name.startswith("sim.") else ""
+            lines.append(f"{indent}{name}: {mean:.3f}ms")
+
+        line_height = 14
+        top = screen.get_height() - len(lines) * line_height - 10
+        panel = screen.fill((20, 20, 20), (5, top - 5, 230, len(lines) * line_height + 10))
+        for i, line in enumerate(lines):
+            text = self.font.render(line, True, (200, 255, 200))
+            screen.blit(text, (10, top + i * line_height))
+        return [panel]
+
+    def dump(self, path):
+        # Write every recorded frame as a CSV row, times in milliseconds
+        data = self.recorded() * 1000
+        np.savetxt(path, data, fmt="%.4f", delimiter=",", header=",".join(self.stages + ["frame"]), comments="")
+        print(f"Frame times written to {path} ({len(data)} frames)")
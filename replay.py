@@ -0,0 +1,145 @@
+import struct
+import time
+import zlib
+from savegame import snapshot
+from simulation import Simulation
+
+# File layout: MAGIC, a '<HQq' header (format version, seed, starting
+# resources), then one record per event. Every record starts with a '<BQ'
+# (kind, tick) prefix followed by the payload for its kind.
+MAGIC = b"IDRP"
+VERSION = 1
+HEADER = struct.Struct("<HQq")
+MAX_SEED = 2 ** 64 - 1  # The header stores the seed unsigned
+RECORD = struct.Struct("<BQ")
+ACTION, BOMB, CHECKSUM, END = range(4)
+PAYLOADS = {
+    ACTION: struct.Struct("<B"),  # Index into ACTIONS
+    BOMB: struct.Struct("<hh"),  # Bomb position
+    CHECKSUM: struct.Struct("<I"),  # crc32 of the game state
+    END: struct.Struct("<"),
+}
+
+# Actions that change the game. Messages such as "Cannot Afford Bomb" only
+# print, so they are not recorded.
+ACTIONS = [
+    "Upgrade Laser", "Upgrade Bomb", "Upgrade Health", "Activate AntiGrav", "Upgrade AntiGrav",
+    "Spawn Spaceship", "Upgrade Spaceship", "Upgrade Harvesting",
+]
+CHECKSUM_INTERVAL = 600  # Ticks between state checksums
+
+def state_checksum(simulation):
+    return zlib.crc32(snapshot(simulation))
+
+class Recorder:
+    # Writes the seed and every action with the tick it was applied on, plus
+    # a checksum of the game state every CHECKSUM_INTERVAL ticks. Start
+    # recording on a fresh Simulation, before its first tick.
+    def __init__(self, path, simulation):
+        self.simulation = simulation
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + HEADER.pack(VERSION, simulation.seed, simulation.resources))
+        simulation.stages.append(("checksum", self.checksum))
+
+    def write(self, kind, *payload):
+        self.file.write(RECORD.pack(kind, self.simulation.clock.ticks) + PAYLOADS[kind].pack(*payload))
+
+    def record(self, action):
+        # Call right before the action is applied
+        if isinstance(action, tuple) and action[0] == "Place Bomb":
+            self.write(BOMB, *action[1])
+        elif action in ACTIONS:
+            self.write(ACTION, ACTIONS.index(action))
+
+    def checksum(self):
+        if self.simulation.clock.ticks % CHECKSUM_INTERVAL == 0:
+            self.write(CHECKSUM, state_checksum(self.simulation))
+
+    def close(self):
+        self.write(END)
+        self.file.close()
+
+class Replayer:
+    # Feeds a recording back through Simulation.apply_action on the same
+    # ticks and compares the state checksums as it goes
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        version, self.seed, self.resources = HEADER.unpack_from(data, len(MAGIC))
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+
+        self.actions = {}  # Tick -> actions applied before that tick ran
+        self.checksums = {}  # Tick -> expected state checksum
+        self.end_tick = None
+        offset = len(MAGIC) + HEADER.size
+        while offset < len(data):
+            kind, tick = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            payload = PAYLOADS[kind].unpack_from(data, offset)
+            offset += PAYLOADS[kind].size
+            if kind == ACTION:
+                self.actions.setdefault(tick, []).append(ACTIONS[payload[0]])
+            elif kind == BOMB:
+                self.actions.setdefault(tick, []).append(("Place Bomb", payload))
+            elif kind == CHECKSUM:
+                self.checksums[tick] = payload[0]
+            else:
+                self.end_tick = tick
+        if self.end_tick is None:
+            # The recording was cut short; play what is there
+            self.end_tick = max([*self.actions, *self.checksums, 0])
+
+        self.simulation = None
+        self.checked = 0
+        self.diverged_at = None  # First tick whose checksum did not match
+
+    def start(self, simulation):
+        # Set up a fresh Simulation created with this replay's seed
+        self.simulation = simulation
+        simulation.resources = self.resources
+        simulation.stages.append(("checksum", self.checksum))
+
+    def checksum(self):
+        ticks = self.simulation.clock.ticks
+        expected = self.checksums.get(ticks)
+        if expected is None:
+            return
+        self.checked += 1
+        if self.diverged_at is None and state_checksum(self.simulation) != expected:
+            self.diverged_at = ticks
+            print(f"Replay diverged at tick {ticks}")
+
+    @property
+    def finished(self):
+        simulation = self.simulation
+        return simulation.game_over or simulation.clock.ticks >= self.end_tick
+
+    def step(self, n_ticks=1):
+        simulation = self.simulation
+        for _ in range(n_ticks):
+            for action in self.actions.pop(simulation.clock.ticks, ()):
+                simulation.apply_action(action)
+            if self.finished:
+                break
+            simulation.tick()
+
+    def report(self):
+        status = "OK" if self.diverged_at is None else f"diverged at tick {self.diverged_at}"
+        print(f"Replay - Ticks: {self.simulation.clock.ticks}/{self.end_tick}, "
+              f"Checksums: {self.checked}/{len(self.checksums)}, {status}")
+
+def replay_headless(path, width=1200, height=900):
+    # Play a recording back as fast as the CPU allows, without a display
+    replayer = Replayer(path)
+    replayer.start(Simulation(width, height, seed=replayer.seed))
+    start = time.perf_counter()
+    while not replayer.finished:
+        replayer.step(CHECKSUM_INTERVAL)
+    elapsed = time.perf_counter() - start
+    replayer.report()
+    print(f"Replayed {replayer.simulation.clock.ticks} ticks in {elapsed:.2f}s "
+          f"({replayer.simulation.clock.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    return replayer
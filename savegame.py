@@ -0,0 +1,227 @@
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+from unitstore import FIELDS
+
+# File layout: MAGIC, then a '<HQd' header (format version, uncompressed
+# payload size, wall-clock save time), then the zlib-compressed payload.
+MAGIC = b"IDSV"
+VERSION = 1
+HEADER = struct.Struct("<HQd")
+
+# Scalar state, packed field by field with struct
+SIMULATION_FIELDS = [("resources", "q"), ("harvesting_level", "q"), ("spawn_timer", "q"), ("game_over", "?")]
+LEVEL_FIELDS = [
+    ("level", "q"), ("spawn_rate_multiplier", "d"), ("speed_multiplier", "d"),
+    ("xp", "q"), ("xp_to_next_level", "q"),
+]
+TOWN_FIELDS = [
+    ("health", "q"), ("max_health", "q"),
+    ("laser_damage", "q"), ("laser_cooldown", "q"), ("laser_range", "q"), ("laser_level", "q"),
+    ("last_laser_time", "q"), ("laser_ready", "?"),
+    ("bomb_damage_amount", "q"), ("bomb_radius", "q"), ("bomb_cost", "q"), ("bomb_upgrade_level", "q"),
+    ("bomb_timer", "q"), ("explosion_start_time", "q"),
+    ("anti_grav_active", "?"), ("anti_grav_radius", "q"), ("anti_grav_slow", "d"), ("anti_grav_level", "q"),
+    ("health_upgrade_level", "q"), ("health_regen", "q"),
+]
+POINT = struct.Struct("<?dd")  # Optional (x, y), used for the bomb and explosion
+
+# One record per spaceship, written as a single structured array
+SHIP_DTYPE = np.dtype([
+    ("x", "<f8"), ("y", "<f8"), ("angle", "<f8"), ("target_angle", "<f8"), ("patrol_angle", "<f8"),
+    ("detect_radius", "<i8"), ("attack_radius", "<i8"), ("laser_damage", "<i8"), ("laser_cooldown", "<i8"),
+    ("last_shot", "<i8"), ("laser_end_time", "<i8"), ("laser_ready", "?"),
+])
+
+COUNT = struct.Struct("<Q")
+
+def fields_struct(fields):
+    return struct.Struct("<" + "".join(fmt for _, fmt in fields))
+
+def pack_fields(obj, fields):
+    return fields_struct(fields).pack(*(getattr(obj, name) for name, _ in fields))
+
+def unpack_fields(obj, fields, data, offset):
+    layout = fields_struct(fields)
+    for (name, _), value in zip(fields, layout.unpack_from(data, offset)):
+        setattr(obj, name, value)
+    return offset + layout.size
+
+def pack_point(point):
+    if point is None:
+        return POINT.pack(False, 0, 0)
+    return POINT.pack(True, *point)
+
+def unpack_point(data, offset):
+    present, x, y = POINT.unpack_from(data, offset)
+    return ((x, y) if present else None), offset + POINT.size
+
+def pack_blob(blob):
+    return COUNT.pack(len(blob)) + blob
+
+def unpack_blob(data, offset):
+    (size,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    return data[offset:offset + size], offset + size
+
+def pending_spawns(units):
+    # Spawn draws already taken from the rng but not used yet, one
+    # (type, x, y) row each
+    pick = units.spawn_cursor
+    return np.array([units.spawn_types[pick:], units.spawn_x[pick:], units.spawn_y[pick:]], dtype="<i8").T
+
+def snapshot(simulation):
+    # Uncompressed payload for the whole game state. Cheap enough to take on
+    # the main thread between frames; unit columns are copied in bulk.
+    town_centre = simulation.town_centre
+    units = simulation.units
+    n = len(units)
+    parts = [
+        COUNT.pack(simulation.clock.ticks),
+        pack_fields(simulation, SIMULATION_FIELDS),
+        pack_fields(simulation.level_manager, LEVEL_FIELDS),
+        pack_fields(town_centre, TOWN_FIELDS),
+        pack_point(town_centre.bomb),
+        pack_point(town_centre.explosion),
+        pack_blob(json.dumps(units.rng.bit_generator.state).encode()),
+        pack_blob(pending_spawns(units).tobytes()),
+        COUNT.pack(n),
+    ]
+    for name, dtype in FIELDS.items():
+        parts.append(getattr(units, name)[:n].astype(np.dtype(dtype).newbyteorder("<"), copy=False).tobytes())
+
+    ships = np.zeros(len(simulation.spaceships), dtype=SHIP_DTYPE)
+    for i, ship in enumerate(simulation.spaceships):
+        ships[i] = tuple(getattr(ship, name) for name in SHIP_DTYPE.names)
+    parts.append(COUNT.pack(len(ships)))
+    parts.append(ships.tobytes())
+    return b"".join(parts)
+
+def encode(payload, saved_at):
+    return MAGIC + HEADER.pack(VERSION, len(payload), saved_at) + zlib.compress(payload, 6)
+
+def write_file(path, data):
+    # Write to a temporary file and swap it in, so a crash never leaves a
+    # half-written save behind
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def save_game(simulation, path):
+    write_file(path, encode(snapshot(simulation), time.time()))
+
+def load_game(simulation, path):
+    # Restore a saved game into a freshly constructed simulation. Returns the
+    # wall-clock time the save was made. Raises ValueError, before touching
+    # the simulation, if the file is not a save this version can read.
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a save file")
+    if len(data) < len(MAGIC) + HEADER.size:
+        raise ValueError(f"{path} is truncated")
+    version, size, saved_at = HEADER.unpack_from(data, len(MAGIC))
+    if version != VERSION:
+        raise ValueError(f"Unsupported save version {version}")
+    try:
+        payload = zlib.decompress(data[len(MAGIC) + HEADER.size:])
+    except zlib.error:
+        raise ValueError(f"{path} is truncated or corrupt")
+    if len(payload) != size:
+        raise ValueError(f"{path} is truncated")
+
+    town_centre = simulation.town_centre
+    units = simulation.units
+    (ticks,) = COUNT.unpack_from(payload, 0)
+    offset = COUNT.size
+    simulation.clock.ticks = ticks
+    simulation.current_time = simulation.clock.time
+    offset = unpack_fields(simulation, SIMULATION_FIELDS, payload, offset)
+    offset = unpack_fields(simulation.level_manager, LEVEL_FIELDS, payload, offset)
+    offset = unpack_fields(town_centre, TOWN_FIELDS, payload, offset)
+    town_centre.bomb, offset = unpack_point(payload, offset)
+    town_centre.explosion, offset = unpack_point(payload, offset)
+    rng_state, offset = unpack_blob(payload, offset)
+    units.rng.bit_generator.state = json.loads(rng_state)
+    pending, offset = unpack_blob(payload, offset)
+    pending = np.frombuffer(pending, dtype="<i8").reshape(-1, 3)
+    units.spawn_types = pending[:, 0].tolist()
+    units.spawn_x = pending[:, 1].tolist()
+    units.spawn_y = pending[:, 2].tolist()
+    units.spawn_cursor = 0
+
+    (n,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    units.reserve(n)
+    for name, dtype in FIELDS.items():
+        column = np.frombuffer(payload, dtype=np.dtype(dtype).newbyteorder("<"), count=n, offset=offset)
+        getattr(units, name)[:n] = column
+        offset += column.nbytes
+    units.count = n
+    units.renumber()
+    units.live_by_type[:] = np.bincount(units.type_id[:n], minlength=len(units.live_by_type))
+    units.grid_dirty = True
+
+    (ship_count,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    ships = np.frombuffer(payload, dtype=SHIP_DTYPE, count=ship_count, offset=offset)
+    simulation.spaceships = []
+    for record in ships:
+        ship = simulation.add_spaceship()
+        for name in SHIP_DTYPE.names:
+            setattr(ship, name, record[name].item())
+
+    # Timers are callbacks, so they are rebuilt from the restored state
+    simulation.scheduler.clear()
+    town_centre.restore_schedule()
+    for ship in simulation.spaceships:
+        ship.restore_schedule()
+    return saved_at
+
+class Autosaver:
+    # Takes snapshots on the caller's thread and leaves compression, writing
+    # and fsync to a background thread, so saving never stalls a frame
+    def __init__(self, path, interval=30000):
+        self.path = path
+        self.interval = interval  # Game milliseconds between autosaves
+        self.last_save_time = None
+        self.thread = None
+
+    def update(self, simulation):
+        if self.last_save_time is None:
+            self.last_save_time = simulation.current_time
+        elif simulation.current_time - self.last_save_time >= self.interval:
+            self.save(simulation)
+
+    def save(self, simulation):
+        if self.thread is not None and self.thread.is_alive():
+            return  # The previous save is still being written; try again next frame
+        self.last_save_time = simulation.current_time
+        payload = snapshot(simulation)
+        self.thread = threading.Thread(target=self.write, args=(payload, time.time()), daemon=True)
+        self.thread.start()
+
+    def write(self, payload, saved_at):
+        write_file(self.path, encode(payload, saved_at))
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+
+    def close(self, simulation):
+        # Final save on quit; waits for it to reach the disk
+        self.wait()
+        save_game(simulation, self.path)
+
+    def discard(self):
+        # Drop the save, e.g. once the game is over
+        self.wait()
+        if os.path.exists(self.path):
+            os.remove(self.path)
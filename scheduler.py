@@ -0,0 +1,38 @@
+import heapq
+
+class Scheduler:
+    # Priority queue of callbacks keyed by game time in milliseconds. Each
+    # tick only the events that are due get popped, so the cost depends on
+    # how many events fire rather than how many entities are waiting.
+    def __init__(self, clock):
+        self.clock = clock  # Shared simulation clock
+        self.queue = []
+        self.sequence = 0  # Keeps events due at the same time in FIFO order
+
+    def __len__(self):
+        return len(self.queue)
+
+    def schedule_at(self, due_time, callback):
+        # Returns the event entry, which can be passed to cancel()
+        event = [due_time, self.sequence, callback]
+        self.sequence += 1
+        heapq.heappush(self.queue, event)
+        return event
+
+    def schedule(self, delay, callback):
+        return self.schedule_at(self.clock.time + delay, callback)
+
+    def clear(self):
+        self.queue = []
+
+    def cancel(self, event):
+        # Cancelled events stay queued and are skipped when they come due
+        if event is not None:
+            event[2] = None
+
+    def run_due(self, current_time):
+        queue = self.queue
+        while queue and queue[0][0] <= current_time:
+            _, _, callback = heapq.heappop(queue)
+            if callback is not None:
+                callback()
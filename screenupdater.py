@@ -0,0 +1,37 @@
+import pygame
+
+FULL_UPDATE_THRESHOLD = 0.35  # Fraction of the screen above which a full flip is cheaper
+
+class ScreenUpdater:
+    # Pushes each finished frame to the display. In "flip" mode the whole
+    # screen is presented every frame. In "dirty" mode only the rectangles
+    # drawn to this frame and the last one are updated, so whatever moved
+    # away is erased too; a full flip is used when those cover too much.
+    def __init__(self, screen, mode="flip", threshold=FULL_UPDATE_THRESHOLD):
+        self.screen = screen
+        self.mode = mode
+        self.threshold = threshold
+        self.previous = []  # Rectangles drawn to last frame
+        self.full = True  # Next frame must be presented in full
+        self.full_updates = 0
+        self.partial_updates = 0
+
+    def invalidate(self):
+        self.full = True
+
+    def present(self, dirty):
+        if self.mode == "flip":
+            pygame.display.flip()
+            return
+
+        screen_rect = self.screen.get_rect()
+        rects = [rect.clip(screen_rect) for rect in self.previous + dirty]
+        area = sum(rect.width * rect.height for rect in rects)
+        self.previous = dirty
+        if self.full or area > screen_rect.width * screen_rect.height * self.threshold:
+            pygame.display.flip()
+            self.full = False
+            self.full_updates += 1
+        else:
+            pygame.display.update(rects)
+            self.partial_updates += 1
@@ -0,0 +1,47 @@
+import time
+
+TICK_RATE = 60  # Simulation ticks per second of game time
+
+def perf_counter_ms():
+    return time.perf_counter() * 1000
+
+class SimClock:
+    # Single source of game time. Time only moves when the simulation ticks,
+    # so cooldowns and effects behave the same at any frame rate or speed.
+    def __init__(self, tick_rate=TICK_RATE, time_source=perf_counter_ms, speed=1.0, max_catch_up=10):
+        self.tick_rate = tick_rate
+        self.tick_ms = 1000 / tick_rate
+        self.ticks = 0
+        self.time_source = time_source  # Real time in milliseconds, only used for pacing
+        self.speed = speed  # Game seconds per real second
+        self.max_catch_up = max_catch_up  # Most ticks to run for one real-time frame
+        self.accumulator = 0
+        self.last_real_time = None
+
+    @property
+    def time(self):
+        # Game time in whole milliseconds, derived from the tick count
+        return self.ticks * 1000 // self.tick_rate
+
+    def advance(self, n_ticks=1):
+        self.ticks += n_ticks
+
+    def ms_until_tick(self):
+        # Real milliseconds until the next tick falls due
+        return (self.tick_ms - self.accumulator) / self.speed
+
+    def ticks_due(self):
+        # How many ticks the simulation owes the real-time clock since last call
+        now = self.time_source()
+        if self.last_real_time is None:
+            self.last_real_time = now
+            return 0
+        self.accumulator += (now - self.last_real_time) * self.speed
+        self.last_real_time = now
+        due = int(self.accumulator // self.tick_ms)
+        self.accumulator -= due * self.tick_ms
+        if due > self.max_catch_up:
+            # Drop the backlog instead of spiralling after a long stall
+            due = self.max_catch_up
+            self.accumulator = 0
+        return due
@@ -0,0 +1,126 @@
+import copy
+import math
+import threading
+import time
+from collections import deque
+import numpy as np
+
+class Snapshot:
+    # Copy of everything that moves between ticks (units, ships and their
+    # lasers), taken while the simulation is paused between ticks so the
+    # renderer never sees a half-finished tick
+    def __init__(self, simulation):
+        units = simulation.units
+        n = units.count
+        self.published_at = time.perf_counter()
+        self.uid = units.uid[:n].copy()
+        self.x = units.x[:n].copy()
+        self.y = units.y[:n].copy()
+        self.type_id = units.type_id[:n].copy()
+        self.beams = units.beam_active()
+
+        ships = simulation.spaceships
+        self.ship_size = [ship.size for ship in ships]
+        self.ship_x = np.array([ship.x for ship in ships], dtype=np.float64)
+        self.ship_y = np.array([ship.y for ship in ships], dtype=np.float64)
+        self.ship_angle = np.array([ship.angle for ship in ships], dtype=np.float64)
+        self.lasers = [line for line in (ship.laser_line(simulation.current_time) for ship in ships) if line]
+
+    def blend(self, previous, alpha):
+        # Positions alpha of the way from previous to this snapshot. Units
+        # are matched by uid; ones that only exist here are drawn where they
+        # are, and ones that died since are dropped.
+        view = copy.copy(self)
+        if previous is self or alpha >= 1:
+            return view
+
+        if previous.uid.size:
+            order = np.argsort(previous.uid)
+            found = order[np.minimum(np.searchsorted(previous.uid, self.uid, sorter=order), previous.uid.size - 1)]
+            matched = previous.uid[found] == self.uid
+            start_x = np.where(matched, previous.x[found], self.x)
+            start_y = np.where(matched, previous.y[found], self.y)
+            view.x = start_x + (self.x - start_x) * alpha
+            view.y = start_y + (self.y - start_y) * alpha
+
+        # Ships are only ever added, so they line up by index
+        k = min(previous.ship_x.size, self.ship_x.size)
+        view.ship_x = self.ship_x.copy()
+        view.ship_y = self.ship_y.copy()
+        view.ship_angle = self.ship_angle.copy()
+        view.ship_x[:k] = previous.ship_x[:k] + (self.ship_x[:k] - previous.ship_x[:k]) * alpha
+        view.ship_y[:k] = previous.ship_y[:k] + (self.ship_y[:k] - previous.ship_y[:k]) * alpha
+        turn = (self.ship_angle[:k] - previous.ship_angle[:k] + math.pi) % (2 * math.pi) - math.pi
+        view.ship_angle[:k] = previous.ship_angle[:k] + turn * alpha
+        return view
+
+class SimulationRunner:
+    # Steps the simulation on its own thread at the clock's fixed tick rate,
+    # so a slow frame delays what is shown but not the game itself. After
+    # each batch of ticks the last two states are published as snapshots
+    # for the renderer to interpolate between. Actions queued from the UI
+    # are applied between ticks. Anything else reading or changing live
+    # simulation state from another thread must hold lock.
+    def __init__(self, simulation, replayer=None, recorder=None):
+        self.simulation = simulation
+        self.replayer = replayer  # Supplies the actions and the end of a replay
+        self.recorder = recorder
+        self.lock = threading.Lock()
+        self.actions = deque()
+        snapshot = Snapshot(simulation)
+        self.snapshots = (snapshot, snapshot)  # (previous, latest), replaced as a pair
+        self.running = False
+        self.thread = None
+
+    @property
+    def finished(self):
+        if self.replayer:
+            return self.replayer.finished
+        return self.simulation.game_over
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def submit(self, action):
+        self.actions.append(action)
+
+    def run(self):
+        simulation = self.simulation
+        clock = simulation.clock
+        step = self.replayer.step if self.replayer else simulation.step
+        while self.running and not self.finished:
+            due = clock.ticks_due()
+            if due or self.actions:
+                with self.lock:
+                    while self.actions:
+                        action = self.actions.popleft()
+                        if self.recorder:
+                            self.recorder.record(action)
+                        simulation.apply_action(action)
+                    for i in range(due):
+                        if self.finished:
+                            break
+                        step(1)
+                        if i >= due - 2 or self.finished:
+                            self.publish()
+            time.sleep(max(0.0, clock.ms_until_tick() / 1000))
+
+    def publish(self):
+        self.snapshots = (self.snapshots[1], Snapshot(self.simulation))
+
+    def view(self):
+        # What to draw now: the last two snapshots blended by how far real
+        # time has got towards the next tick, so motion stays smooth at any
+        # frame rate at the cost of showing the game one tick behind
+        previous, latest = self.snapshots
+        clock = self.simulation.clock
+        alpha = (time.perf_counter() - latest.published_at) * 1000 * clock.speed / clock.tick_ms
+        return latest.blend(previous, min(max(alpha, 0.0), 1.0))
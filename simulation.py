@@ -0,0 +1,227 @@
+import random
+import time
+import numpy as np
+from simclock import SimClock
+from scheduler import Scheduler
+from towncentre import TownCentre
+from units import spawn_random_unit
+from unitstore import UnitStore
+from levelmanager import LevelManager
+from spaceship import Spaceship, SHIP_UPGRADE_STEPS, target_fleet
+
+# Price of each purchase. Bombs are priced by the town centre's bomb_cost.
+ACTION_COSTS = {
+    "Upgrade Laser": 50,
+    "Upgrade Bomb": 100,
+    "Upgrade Health": 100,
+    "Activate AntiGrav": 50,
+    "Upgrade AntiGrav": 50,
+    "Spawn Spaceship": 200,
+    "Upgrade Spaceship": 100,
+    "Upgrade Harvesting": 50,
+}
+
+class Simulation:
+    # Owns all game state and advances it without touching the display,
+    # fonts or the frame clock, so it can be stepped as fast as the CPU allows
+    def __init__(self, width=1200, height=900, clock=None, seed=None):
+        self.width = width
+        self.height = height
+        self.seed = seed  # Same seed and same actions give the same game
+        self.rng = random.Random(seed)
+        self.clock = clock or SimClock()
+        self.scheduler = Scheduler(self.clock)
+        self.town_centre = TownCentre(width // 2, height // 2, self.clock, self.scheduler)
+        self.level_manager = LevelManager()
+        self.units = UnitStore(width, height, self.town_centre, self.clock, np.random.default_rng(seed))
+        self.spaceships = []
+        self.ship_upgrade_steps = dict(SHIP_UPGRADE_STEPS)  # Shared by every ship
+        self.action_costs = dict(ACTION_COSTS)
+        self.resources = 0
+        self.harvesting_level = 0  # Track harvesting upgrade level
+
+        # Unit spawning variables
+        self.base_spawn_interval = 60  # Base ticks between spawns
+        self.spawn_timer = 0
+
+        self.current_time = self.clock.time
+        self.game_over = False
+
+        # Per-tick hand-offs between stages
+        self.slow_factors = None
+        self.defeated_units = 0
+        self.reward = 0
+
+        # Tick pipeline: every stage runs once per tick, in this order
+        self.stages = [
+            ("spawn", self.spawn_units),
+            ("effects", self.apply_effects),
+            ("movement", self.move),
+            ("targeting", self.acquire_targets),
+            ("damage", self.deal_damage),
+            ("resolution", self.resolve),
+            ("economy", self.update_economy),
+        ]
+        self.stage_times = None  # Seconds spent per stage, once timing is enabled
+
+    def step(self, n_ticks=1):
+        for _ in range(n_ticks):
+            if self.game_over:
+                break
+            self.tick()
+
+    def enable_stage_timing(self):
+        self.stage_times = {name: 0.0 for name, _ in self.stages}
+
+    def disable_stage_timing(self):
+        self.stage_times = None
+
+    def tick(self):
+        self.clock.advance()
+        self.current_time = self.clock.time
+        if self.stage_times is None:
+            for _, stage in self.stages:
+                stage()
+        else:
+            for name, stage in self.stages:
+                start = time.perf_counter()
+                stage()
+                self.stage_times[name] += time.perf_counter() - start
+
+    def spawn_units(self):
+        self.spawn_timer += 1
+        spawn_interval = self.level_manager.get_spawn_interval(self.base_spawn_interval)
+        if self.spawn_timer >= spawn_interval:
+            i = spawn_random_unit(self.units)
+            self.units.speed[i] = self.level_manager.get_unit_speed(self.units.speed[i])
+            self.spawn_timer = 0
+
+    def apply_effects(self):
+        # Fire due cooldowns and timed effects, then the anti-grav slow field
+        self.scheduler.run_due(self.current_time)
+        self.slow_factors = self.town_centre.apply_anti_grav(self.units)
+
+    def move(self):
+        self.units.update(self.slow_factors)
+        for ship in self.spaceships:
+            ship.move()
+
+    def acquire_targets(self):
+        target_fleet(self.spaceships, self.units, self.current_time)
+        self.town_centre.acquire_target(self.units, self.current_time)
+
+    def deal_damage(self):
+        for ship in self.spaceships:
+            ship.fire(self.units, self.current_time)
+        self.town_centre.deal_damage(self.units, self.current_time)
+
+    def resolve(self):
+        # Remove collided and destroyed units in one pass, tallying rewards and XP
+        self.defeated_units, self.reward, damage = self.units.resolve(self.town_centre)
+        if damage:
+            self.town_centre.take_damage(damage)
+
+    def update_economy(self):
+        if self.reward:
+            self.update_resources(self.reward)
+        self.level_manager.update(self.defeated_units)
+
+        # Check game over condition
+        if self.town_centre.health <= 0:
+            self.game_over = True
+
+    def update_resources(self, amount):
+        self.resources += amount
+
+    def upgrade_harvesting(self):
+        cost = self.action_costs["Upgrade Harvesting"]
+        if self.resources >= cost:
+            self.resources -= cost
+            self.harvesting_level += 1
+            return True
+        return False
+
+    def add_spaceship(self):
+        ship = Spaceship(self.width, self.height, self.town_centre, self.scheduler, self.rng)
+        ship.upgrade_steps = self.ship_upgrade_steps
+        self.spaceships.append(ship)
+        return ship
+
+    def apply_action(self, action):
+        town_centre = self.town_centre
+        costs = self.action_costs
+
+        if action == "Upgrade Harvesting":
+            if self.upgrade_harvesting():
+                print(f"Harvesting Upgraded - Level: {self.harvesting_level}")
+                self.units.value[:len(self.units)] += 1  # Increase the value of all existing units
+
+        elif action == "Upgrade Laser":
+            if self.resources >= costs[action]:
+                self.update_resources(-costs[action])
+                town_centre.upgrade_laser()
+                print(f"Laser Upgraded - Level: {town_centre.laser_level}, Damage: {town_centre.laser_damage}, Frequency: {1000/town_centre.laser_cooldown:.2f} shots/second")
+            else:
+                print("Not enough resources to upgrade Laser")
+
+        elif isinstance(action, tuple) and action[0] == "Place Bomb":
+            if self.resources >= town_centre.bomb_cost:
+                self.update_resources(-town_centre.bomb_cost)
+                town_centre.place_bomb(*action[1])
+                print(f"Bomb Placed - Cost: {town_centre.bomb_cost}")
+            else:
+                print("Not enough resources to place Bomb")
+
+        elif action == "Upgrade Bomb":
+            if self.resources >= costs[action]:
+                self.update_resources(-costs[action])
+                town_centre.upgrade_bomb()
+                print(f"Bomb Upgraded - Level: {town_centre.bomb_upgrade_level}, Damage: {town_centre.bomb_damage_amount}, Radius: {town_centre.bomb_radius}")
+            else:
+                print("Not enough resources to upgrade Bomb")
+
+        elif action == "Upgrade Health":
+            if self.resources >= costs[action]:
+                self.update_resources(-costs[action])
+                health_regen = town_centre.upgrade_health()
+                print(f"Health Upgraded - Max Health: {town_centre.max_health}, "
+                      f"Current Health: {town_centre.health}, "
+                      f"Health Regen: {health_regen} per 2 seconds")
+            else:
+                print("Not enough resources to upgrade Health")
+
+        elif action.startswith("Cannot Afford"):
+            print(action)  # You might want to show this message to the player in the UI
+
+        elif action == "Activate AntiGrav":
+            if self.resources >= costs[action] and not town_centre.anti_grav_active:
+                self.update_resources(-costs[action])
+                town_centre.activate_anti_grav()
+                print("AntiGrav Activated")
+            elif town_centre.anti_grav_active:
+                print("AntiGrav is already active")
+            else:
+                print("Not enough resources to activate AntiGrav")
+
+        elif action == "Upgrade AntiGrav":
+            if self.resources >= costs[action] and town_centre.anti_grav_active:
+                self.update_resources(-costs[action])
+                town_centre.upgrade_anti_grav()
+                print(f"AntiGrav Upgraded - Level: {town_centre.anti_grav_level}, Slow: {town_centre.anti_grav_slow*100:.1f}%, Radius: {town_centre.anti_grav_radius}")
+            elif not town_centre.anti_grav_active:
+                print("AntiGrav needs to be activated first")
+            else:
+                print("Not enough resources to upgrade AntiGrav")
+
+        elif action == "Spawn Spaceship":
+            if self.resources >= costs[action]:
+                self.update_resources(-costs[action])
+                self.add_spaceship()
+                print("Spaceship spawned")
+
+        elif action == "Upgrade Spaceship":
+            if self.resources >= costs[action] and self.spaceships:
+                self.update_resources(-costs[action])
+                for ship in self.spaceships:
+                    ship.upgrade()
+                print("Spaceships upgraded")
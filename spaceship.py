@@ -1,64 +1,99 @@
 import pygame
 import math
 import random
+import numpy as np
+from spatialgrid import SpatialGrid
+from spritecache import ANGLE_STEPS
+from surfacepool import surface_pool
+from drawlist import SHIP_LAYER
+
+MAX_FLOCK_NEIGHBOURS = 24  # Most nearby ships each ship steers against
+SHIP_SIZE = 25  # 1.25x the BaseUnit size of 20
+
+# Added to each stat per upgrade; the laser cooldown is reduced instead
+SHIP_UPGRADE_STEPS = {"detect_radius": 20, "attack_radius": 15, "laser_damage": 5, "laser_cooldown": 50}
 
 class Spaceship:
-    def __init__(self, screen_width, screen_height, town_centre):
+    def __init__(self, screen_width, screen_height, town_centre, scheduler, rng=random):
+        self.rng = rng  # Random source for the spawn point, seeded for replays
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.town_centre = town_centre
-        self.size = 25  # 1.25x the BaseUnit size of 20
+        self.scheduler = scheduler  # Laser cooldowns fire from here
+        self.size = SHIP_SIZE
         self.speed = 2
         self.detect_radius = 100
         self.attack_radius = 80
         self.laser_damage = 20
         self.laser_cooldown = 500  # milliseconds
         self.last_shot = 0
+        self.laser_ready = True
         self.patrol_angle = 0
         self.patrol_speed = 0.02  # Adjust this to change patrol speed
         self.spawn()
         self.laser_duration = 100  # Duration to show the laser in milliseconds
         self.laser_end_time = 0  # Time when the current laser should stop being drawn
         self.laser_target = None  # The current target of the laser
+        self.shot_target = None  # Unit slot to shoot this tick
         self.separation_distance = 50  # Desired separation between spaceships
         self.alignment_factor = 0.1  # How much to align with average direction
         self.cohesion_factor = 0.1  # How much to move towards the center of mass
         self.target_angle = self.angle
         self.rotation_speed = 0.1  # Adjust this value to change how quickly the spaceship rotates
+        self.upgrade_steps = SHIP_UPGRADE_STEPS
 
     def spawn(self):
-        side = random.choice(['top', 'right', 'bottom', 'left'])
+        rng = self.rng
+        side = rng.choice(['top', 'right', 'bottom', 'left'])
         if side == 'top':
-            self.x = random.randint(0, self.screen_width)
+            self.x = rng.randint(0, self.screen_width)
             self.y = -self.size
         elif side == 'right':
             self.x = self.screen_width + self.size
-            self.y = random.randint(0, self.screen_height)
+            self.y = rng.randint(0, self.screen_height)
         elif side == 'bottom':
-            self.x = random.randint(0, self.screen_width)
+            self.x = rng.randint(0, self.screen_width)
             self.y = self.screen_height + self.size
         else:  # left
             self.x = -self.size
-            self.y = random.randint(0, self.screen_height)
-        self.angle = random.uniform(0, 2 * math.pi)
-
-    def update(self, units, current_time, spaceships):
-        target_detected = False
-        for unit in units:
-            distance = math.hypot(unit.x - self.x, unit.y - self.y)
-            if distance <= self.detect_radius:
-                target_detected = True
-                self.target_angle = math.atan2(unit.y - self.y, unit.x - self.x)
-                if distance <= self.attack_radius and current_time - self.last_shot >= self.laser_cooldown:
-                    unit.take_damage(self.laser_damage)
-                    self.last_shot = current_time
-                    self.laser_end_time = current_time + self.laser_duration
-                    self.laser_target = (unit.x, unit.y)  # Store the target's position
-                break
-
-        if not target_detected:
-            self.flock(spaceships)
-
+            self.y = rng.randint(0, self.screen_height)
+        self.angle = rng.uniform(0, 2 * math.pi)
+
+    def acquire_target(self, units, current_time):
+        # Turn towards the first unit in range and mark it to be shot this
+        # tick if it is close enough and the laser is ready; False if none is
+        self.shot_target = None
+        if len(units):
+            detected = units.spatial_grid().query_radius(self.x, self.y, self.detect_radius)
+            if detected.size:
+                # Engage the first unit in range
+                i = detected[0]
+                unit_x, unit_y = units.x[i], units.y[i]
+                self.target_angle = math.atan2(unit_y - self.y, unit_x - self.x)
+                if self.laser_ready and math.hypot(unit_x - self.x, unit_y - self.y) <= self.attack_radius:
+                    self.shot_target = i
+                return True
+        return False
+
+    def fire(self, units, current_time):
+        if self.shot_target is not None:
+            i = self.shot_target
+            units.take_damage(i, self.laser_damage)
+            self.last_shot = current_time
+            self.laser_end_time = current_time + self.laser_duration
+            self.laser_target = (units.x[i], units.y[i])  # Store the target's position
+            self.laser_ready = False
+            self.scheduler.schedule(self.laser_cooldown, self.reload_laser)
+
+    def reload_laser(self):
+        self.laser_ready = True
+
+    def restore_schedule(self):
+        # Re-register the laser reload after the state has been loaded
+        if not self.laser_ready:
+            self.scheduler.schedule_at(self.last_shot + self.laser_cooldown, self.reload_laser)
+
+    def move(self):
         # Smoothly rotate towards the target angle
         angle_diff = (self.target_angle - self.angle + math.pi) % (2 * math.pi) - math.pi
         if abs(angle_diff) > 0.01:  # Only rotate if the difference is significant
@@ -72,73 +107,127 @@ class Spaceship:
         self.x %= self.screen_width
         self.y %= self.screen_height
 
-    def flock(self, spaceships):
-        separation = [0, 0]
-        alignment = [0, 0]
-        cohesion = [0, 0]
-        count = 0
-
-        for other in spaceships:
-            if other != self:
-                distance = math.hypot(other.x - self.x, other.y - self.y)
-                if distance < self.separation_distance:
-                    separation[0] += self.x - other.x
-                    separation[1] += self.y - other.y
-                if distance < self.detect_radius:
-                    alignment[0] += math.cos(other.angle)
-                    alignment[1] += math.sin(other.angle)
-                    cohesion[0] += other.x
-                    cohesion[1] += other.y
-                    count += 1
-
-        if count > 0:
-            # Normalize and apply factors
-            alignment[0] /= count
-            alignment[1] /= count
-            cohesion[0] = cohesion[0] / count - self.x
-            cohesion[1] = cohesion[1] / count - self.y
-
-        # Calculate patrol position
-        patrol_radius = self.town_centre.anti_grav_radius + self.size
-        patrol_x = self.town_centre.x + math.cos(self.patrol_angle) * patrol_radius
-        patrol_y = self.town_centre.y + math.sin(self.patrol_angle) * patrol_radius
-
-        # Combine all influences
-        target_x = patrol_x + separation[0] + alignment[0] * self.alignment_factor + cohesion[0] * self.cohesion_factor
-        target_y = patrol_y + separation[1] + alignment[1] * self.alignment_factor + cohesion[1] * self.cohesion_factor
-
-        # Instead of setting self.angle directly, set self.target_angle
-        self.target_angle = math.atan2(target_y - self.y, target_x - self.x)
-
-        # Update patrol angle
-        self.patrol_angle += self.patrol_speed
-
-    def draw(self, screen, current_time):
-        # Draw spaceship body
-        points = [
-            (self.x + self.size * math.cos(self.angle), self.y + self.size * math.sin(self.angle)),
-            (self.x + self.size/2 * math.cos(self.angle + 2.5), self.y + self.size/2 * math.sin(self.angle + 2.5)),
-            (self.x + self.size/2 * math.cos(self.angle - 2.5), self.y + self.size/2 * math.sin(self.angle - 2.5))
-        ]
-        pygame.draw.polygon(screen, (200, 200, 200), points)
-
-        # Draw engine glow
-        glow_pos = (int(self.x - self.size/2 * math.cos(self.angle)), int(self.y - self.size/2 * math.sin(self.angle)))
-        pygame.draw.circle(screen, (0, 100, 255), glow_pos, int(self.size/4))
-
-        # Draw laser if it's active
+    def laser_line(self, current_time):
+        # The (start, end) of the laser while it is shown, otherwise None
         if current_time < self.laser_end_time and self.laser_target:
-            laser_start = (int(self.x), int(self.y))
-            laser_end = self.laser_target
-            pygame.draw.line(screen, (255, 0, 0), laser_start, laser_end, 2)  # Red laser with width 2
+            return (int(self.x), int(self.y)), self.laser_target
+        return None
 
     def upgrade(self):
-        self.detect_radius += 20
-        self.attack_radius += 15
-        self.laser_damage += 5
-        self.laser_cooldown = max(100, self.laser_cooldown - 50)
+        steps = self.upgrade_steps
+        self.detect_radius += steps["detect_radius"]
+        self.attack_radius += steps["attack_radius"]
+        self.laser_damage += steps["laser_damage"]
+        self.laser_cooldown = max(100, self.laser_cooldown - steps["laser_cooldown"])
         
         # Debug print statement
         print(f"Spaceship Upgraded - Detect Radius: {self.detect_radius}, Attack Radius: {self.attack_radius}, "
               f"Laser Damage: {self.laser_damage}, Laser Cooldown: {self.laser_cooldown}ms, "
               f"Shots per second: {1000/self.laser_cooldown:.2f}")
+
+def emit_ship(draw_list, size, x, y, angle):
+    # Adds a ship's sprite, pre-rendered at the nearest of ANGLE_STEPS headings
+    step = round(angle * ANGLE_STEPS / (2 * math.pi)) % ANGLE_STEPS
+    sprite = ship_sprite(size, step)
+    draw_list.add(SHIP_LAYER, sprite, (int(x) - size, int(y) - size))
+
+def ship_sprite(size, step):
+    return surface_pool.get(("ship", size, step), render_ship, size, step * 2 * math.pi / ANGLE_STEPS)
+
+def warm_ship_sprites(size):
+    # Renders the sprite for every heading, one per step
+    for step in range(ANGLE_STEPS):
+        ship_sprite(size, step)
+        yield
+
+def render_ship(size, angle):
+    surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    x = y = size
+
+    # Draw spaceship body
+    points = [
+        (x + size * math.cos(angle), y + size * math.sin(angle)),
+        (x + size/2 * math.cos(angle + 2.5), y + size/2 * math.sin(angle + 2.5)),
+        (x + size/2 * math.cos(angle - 2.5), y + size/2 * math.sin(angle - 2.5))
+    ]
+    pygame.draw.polygon(surface, (200, 200, 200), points)
+
+    # Draw engine glow
+    glow_pos = (int(x - size/2 * math.cos(angle)), int(y - size/2 * math.sin(angle)))
+    pygame.draw.circle(surface, (0, 100, 255), glow_pos, int(size/4))
+    return surface
+
+def draw_laser(screen, start, end):
+    # Returns the rectangle drawn to
+    return pygame.draw.line(screen, (255, 0, 0), start, end, 2)  # Red laser with width 2
+
+def target_fleet(spaceships, units, current_time):
+    # Ships with no unit in range fall back to flocking around the patrol path
+    flocking = np.array([not ship.acquire_target(units, current_time) for ship in spaceships], dtype=bool)
+    if flocking.any():
+        flock(spaceships, flocking)
+
+def flock(spaceships, flocking):
+    # Separation, alignment and cohesion for every flocking ship at once.
+    # Neighbours come from a grid with cells at least one detect radius wide,
+    # and each ship steers against at most its nearest MAX_FLOCK_NEIGHBOURS,
+    # plus any closer than its separation distance.
+    n = len(spaceships)
+    x = np.array([ship.x for ship in spaceships])
+    y = np.array([ship.y for ship in spaceships])
+    angle = np.array([ship.angle for ship in spaceships])
+    detect_radius = np.array([ship.detect_radius for ship in spaceships], dtype=np.float64)
+    separation_distance = np.array([ship.separation_distance for ship in spaceships], dtype=np.float64)
+
+    if n <= MAX_FLOCK_NEIGHBOURS + 1:
+        # Small fleets: every other ship is a candidate neighbour
+        i, j = np.nonzero(~np.eye(n, dtype=bool))
+    else:
+        first = spaceships[0]
+        cell_size = max(detect_radius.max(), separation_distance.max())
+        grid = SpatialGrid(first.screen_width, first.screen_height, cell_size)
+        grid.rebuild(x, y)
+        i, j = grid.neighbour_pairs(MAX_FLOCK_NEIGHBOURS, separation_distance)
+    steering = flocking[i]
+    i = i[steering]
+    j = j[steering]
+    distance = np.hypot(x[j] - x[i], y[j] - y[i])
+
+    close = distance < separation_distance[i]
+    separation_x = np.bincount(i[close], weights=x[i[close]] - x[j[close]], minlength=n)
+    separation_y = np.bincount(i[close], weights=y[i[close]] - y[j[close]], minlength=n)
+
+    near = distance < detect_radius[i]
+    i = i[near]
+    j = j[near]
+    count = np.bincount(i, minlength=n)
+    alignment_x = np.bincount(i, weights=np.cos(angle[j]), minlength=n)
+    alignment_y = np.bincount(i, weights=np.sin(angle[j]), minlength=n)
+    cohesion_x = np.bincount(i, weights=x[j], minlength=n)
+    cohesion_y = np.bincount(i, weights=y[j], minlength=n)
+
+    # Normalize by neighbour count where there are neighbours
+    has_neighbours = count > 0
+    divisor = np.maximum(count, 1)
+    alignment_x = alignment_x / divisor
+    alignment_y = alignment_y / divisor
+    cohesion_x = np.where(has_neighbours, cohesion_x / divisor - x, 0)
+    cohesion_y = np.where(has_neighbours, cohesion_y / divisor - y, 0)
+
+    for k in np.flatnonzero(flocking):
+        ship = spaceships[k]
+
+        # Calculate patrol position
+        patrol_radius = ship.town_centre.anti_grav_radius + ship.size
+        patrol_x = ship.town_centre.x + math.cos(ship.patrol_angle) * patrol_radius
+        patrol_y = ship.town_centre.y + math.sin(ship.patrol_angle) * patrol_radius
+
+        # Combine all influences
+        target_x = patrol_x + separation_x[k] + alignment_x[k] * ship.alignment_factor + cohesion_x[k] * ship.cohesion_factor
+        target_y = patrol_y + separation_y[k] + alignment_y[k] * ship.alignment_factor + cohesion_y[k] * ship.cohesion_factor
+
+        # Instead of setting ship.angle directly, set ship.target_angle
+        ship.target_angle = math.atan2(target_y - ship.y, target_x - ship.x)
+
+        # Update patrol angle
+        ship.patrol_angle += ship.patrol_speed
@@ -0,0 +1,110 @@
+import numpy as np
+
+# A cell and its eight neighbours, own cell first
+NEIGHBOUR_OFFSETS = [(0, 0), (-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+
+class SpatialGrid:
+    # Uniform grid over the play area. Points are bucketed by cell on rebuild
+    # and queries only visit the cells overlapping the search circle. Points
+    # off screen are clamped into the border cells.
+    def __init__(self, width, height, cell_size=64):
+        self.cell_size = cell_size
+        self.cols = int(width // cell_size) + 1
+        self.rows = int(height // cell_size) + 1
+        self.order = np.zeros(0, dtype=np.intp)  # Point indices sorted by cell
+        self.starts = np.zeros(self.cols * self.rows + 1, dtype=np.intp)  # Offsets into order per cell
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.cx = np.zeros(0, dtype=np.intp)  # Cell column of each point
+        self.cy = np.zeros(0, dtype=np.intp)  # Cell row of each point
+
+    def rebuild(self, x, y):
+        self.x = x
+        self.y = y
+        cx = np.clip((x // self.cell_size).astype(np.intp), 0, self.cols - 1)
+        cy = np.clip((y // self.cell_size).astype(np.intp), 0, self.rows - 1)
+        self.cx = cx
+        self.cy = cy
+        cells = cy * self.cols + cx
+        self.order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=self.cols * self.rows)
+        np.cumsum(counts, out=self.starts[1:])
+
+    def cell_range(self, low, high, cells):
+        first = min(max(int(low // self.cell_size), 0), cells - 1)
+        last = min(max(int(high // self.cell_size), 0), cells - 1)
+        return first, last
+
+    def candidates(self, x, y, radius):
+        # Points in every cell touched by the circle's bounding box. Cells in a
+        # row are contiguous in sort order, so each row is a single slice.
+        cx0, cx1 = self.cell_range(x - radius, x + radius, self.cols)
+        cy0, cy1 = self.cell_range(y - radius, y + radius, self.rows)
+        slices = []
+        for row in range(cy0 * self.cols, (cy1 + 1) * self.cols, self.cols):
+            start = self.starts[row + cx0]
+            end = self.starts[row + cx1 + 1]
+            if end > start:
+                slices.append(self.order[start:end])
+        if not slices:
+            return self.order[:0]
+        return np.sort(np.concatenate(slices))
+
+    def query_radius(self, x, y, radius):
+        # Indices of all points within radius, in ascending index order
+        candidates = self.candidates(x, y, radius)
+        if candidates.size == 0:
+            return candidates
+        distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+        return candidates[distances <= radius]
+
+    def nearest(self, x, y, max_range):
+        # Index of the closest point within max_range, or None
+        candidates = self.candidates(x, y, max_range)
+        if candidates.size == 0:
+            return None
+        distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+        closest = int(np.argmin(distances))
+        if distances[closest] > max_range:
+            return None
+        return int(candidates[closest])
+
+    def neighbour_pairs(self, max_neighbours, keep_within=0):
+        # (point, neighbour) index pairs for every point against its nearest
+        # max_neighbours points in its own and the eight surrounding cells.
+        # Points closer than keep_within (one value, or one per point) are
+        # always kept, however many there are.
+        n = self.order.size
+        if n == 0:
+            empty = self.order[:0]
+            return empty, empty
+        run_starts = []
+        run_counts = []
+        for dx, dy in NEIGHBOUR_OFFSETS:
+            cx = self.cx + dx
+            cy = self.cy + dy
+            valid = (cx >= 0) & (cx < self.cols) & (cy >= 0) & (cy < self.rows)
+            cells = np.where(valid, cy * self.cols + cx, 0)
+            start = self.starts[cells]
+            run_starts.append(start)
+            run_counts.append(np.where(valid, self.starts[cells + 1] - start, 0))
+        take = np.stack(run_counts, axis=1).ravel()
+
+        # Expand the runs into one entry per candidate pair
+        points = np.repeat(np.repeat(np.arange(n), 9), take)
+        run_offsets = np.repeat(np.cumsum(take) - take, take)
+        positions = np.repeat(np.stack(run_starts, axis=1).ravel(), take) + np.arange(points.size) - run_offsets
+        neighbours = self.order[positions]
+        others = neighbours != points
+        points = points[others]
+        neighbours = neighbours[others]
+
+        # Rank each point's candidates by distance and keep the nearest
+        distance = np.hypot(self.x[neighbours] - self.x[points], self.y[neighbours] - self.y[points])
+        by_distance = np.lexsort((distance, points))
+        points = points[by_distance]
+        neighbours = neighbours[by_distance]
+        distance = distance[by_distance]
+        rank = np.arange(points.size) - np.searchsorted(points, points)
+        keep = (rank < max_neighbours) | (distance < np.broadcast_to(keep_within, (n,))[points])
+        return points[keep], neighbours[keep]
@@ -0,0 +1,94 @@
+import math
+from collections import OrderedDict
+import numpy as np
+import pygame
+from units import UNIT_TYPES, FULL, SILHOUETTE
+
+ANGLE_STEPS = 64  # Headings each unit type is rendered at
+SPRITE_BUDGET = 16 * 1024 * 1024  # Bytes of cached sprites kept before evicting
+SPRITE_EXTENT = 3  # Sprite half-width in multiples of the unit size
+
+class SpriteCache:
+    # Unit sprites pre-rendered with the unit types' own draw methods, one per
+    # quantized heading and detail level, so drawing a unit is a single blit.
+    # Sprites are made on first use and the least recently used are evicted
+    # once the cache grows past its memory budget.
+    def __init__(self, angle_steps=ANGLE_STEPS, budget=SPRITE_BUDGET):
+        self.angle_steps = angle_steps
+        self.budget = budget
+        self.sprites = OrderedDict()  # (type_id, angle step, beam, detail) -> (surface, offset)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def angle_indices(self, angles):
+        # Nearest quantized heading for each angle in radians
+        steps = np.rint(angles * (self.angle_steps / (2 * math.pi))).astype(np.intp)
+        return steps % self.angle_steps
+
+    def get(self, type_id, angle_index, beam=False, detail=FULL):
+        # Returns the sprite and the (x, y) offset from its corner to the unit's position
+        unit_type = UNIT_TYPES[type_id]
+        if detail == SILHOUETTE:
+            beam = False
+            if not unit_type.silhouette_rotates:
+                angle_index = 0
+        elif not unit_type.rotates:
+            angle_index = 0
+        if not unit_type.has_beam:
+            beam = False
+        key = (type_id, angle_index, beam, detail)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+        self.misses += 1
+        sprite = self.render(unit_type, angle_index, beam, detail)
+        self.sprites[key] = sprite
+        self.bytes += self.surface_bytes(sprite[0])
+        while self.bytes > self.budget and len(self.sprites) > 1:
+            _, (evicted, _) = self.sprites.popitem(last=False)
+            self.bytes -= self.surface_bytes(evicted)
+            self.evictions += 1
+        return sprite
+
+    def render(self, unit_type, angle_index, beam, detail):
+        extent = int(unit_type.size * SPRITE_EXTENT)
+        surface = pygame.Surface((extent * 2, extent * 2), pygame.SRCALPHA)
+        angle = angle_index * 2 * math.pi / self.angle_steps
+        if detail == SILHOUETTE:
+            unit_type.draw_silhouette(surface, extent, extent, angle)
+        else:
+            unit_type.draw(surface, extent, extent, angle, beam)
+
+        # Crop to the drawn pixels; blit cost grows with the sprite's area
+        bounds = surface.get_bounding_rect()
+        surface = surface.subsurface(bounds).copy()
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface, (extent - bounds.x, extent - bounds.y)
+
+    def warm(self, details=(FULL, SILHOUETTE)):
+        # Renders every sprite for the given detail levels, one per step
+        for detail in details:
+            for unit_type in UNIT_TYPES:
+                rotates = unit_type.silhouette_rotates if detail == SILHOUETTE else unit_type.rotates
+                beams = (False, True) if unit_type.has_beam and detail == FULL else (False,)
+                for angle_index in range(self.angle_steps if rotates else 1):
+                    for beam in beams:
+                        self.get(unit_type.type_id, angle_index, beam, detail)
+                        yield
+
+    def surface_bytes(self, surface):
+        return surface.get_pitch() * surface.get_height()
+
+    def stats(self):
+        return {
+            'sprites': len(self.sprites),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,37 @@
+import pygame
+
+class SurfacePool:
+    # Effect surfaces shared across frames and objects, keyed by shape, size
+    # and colour. Each one is built the first time it is asked for, so
+    # steady-state frames allocate no surfaces. Callers must not draw on a
+    # pooled surface; changing its surface alpha before a blit is fine.
+    def __init__(self):
+        self.surfaces = {}
+        self.ramps = {}
+
+    def get(self, key, build, *args):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = build(*args)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            self.surfaces[key] = surface
+        return surface
+
+    def circle(self, radius, color):
+        # A filled circle centred on a transparent square; color may carry alpha
+        return self.get(("circle", radius, color), make_circle, radius, color)
+
+    def fade_ramp(self, duration):
+        # Alpha for each elapsed millisecond of a linear fade from 255 to 0
+        ramp = self.ramps.get(duration)
+        if ramp is None:
+            ramp = self.ramps[duration] = [int(max(0, 255 - t / duration * 255)) for t in range(duration + 1)]
+        return ramp
+
+def make_circle(radius, color):
+    surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(surface, color, (radius, radius), radius)
+    return surface
+
+surface_pool = SurfacePool()  # Shared by every draw path
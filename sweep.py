@@ -0,0 +1,212 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Workers import pygame through the unit types
+
+import argparse
+import csv
+import itertools
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from simulation import Simulation, ACTION_COSTS
+from towncentre import LASER_UPGRADE_STEPS
+from spaceship import SHIP_UPGRADE_STEPS
+
+DECISION_INTERVAL = 60  # Ticks between purchase decisions
+
+# Purchase strategies: the opening is bought once in order, then the cycle
+# repeats. The bot always waits until it can afford the next purchase.
+STRATEGIES = {
+    "idle": ([], []),
+    "laser": ([], ["Upgrade Laser"]),
+    "health": ([], ["Upgrade Health"]),
+    "economy": (["Upgrade Harvesting"] * 5, ["Upgrade Laser", "Upgrade Harvesting"]),
+    "antigrav": (["Activate AntiGrav"], ["Upgrade Laser", "Upgrade AntiGrav"]),
+    "fleet": (["Spawn Spaceship"], ["Spawn Spaceship", "Upgrade Spaceship", "Upgrade Laser"]),
+    "bomber": ([], ["Place Bomb", "Upgrade Bomb", "Upgrade Laser"]),
+    "balanced": (["Activate AntiGrav"], [
+        "Upgrade Laser", "Upgrade Health", "Upgrade Harvesting", "Upgrade AntiGrav",
+        "Spawn Spaceship", "Upgrade Spaceship",
+    ]),
+}
+
+# Keys each balance table accepts, for checking --vary before any game runs
+BALANCE_KEYS = {
+    "cost": sorted(ACTION_COSTS),
+    "laser": sorted(LASER_UPGRADE_STEPS),
+    "ship": sorted(SHIP_UPGRADE_STEPS),
+}
+
+def balance_tables(simulation):
+    # Balance parameters are written as table.key, e.g. laser.laser_damage
+    return {
+        "cost": simulation.action_costs,
+        "laser": simulation.town_centre.laser_upgrade_steps,
+        "ship": simulation.ship_upgrade_steps,
+    }
+
+class Bot:
+    # Plays a strategy by feeding actions through Simulation.apply_action
+    def __init__(self, simulation, strategy):
+        opening, cycle = STRATEGIES[strategy]
+        self.simulation = simulation
+        self.opening = list(opening)
+        self.cycle = cycle
+        self.next = 0
+
+    def pending(self):
+        if self.opening:
+            return self.opening[0]
+        if self.cycle:
+            return self.cycle[self.next]
+        return None
+
+    def act(self):
+        simulation = self.simulation
+        action = self.pending()
+        if action is None:
+            return
+        if action == "Place Bomb":
+            # Drop it on the unit closest to the town centre
+            if not len(simulation.units):
+                return
+            i = int(simulation.units.distances_to(simulation.town_centre.x, simulation.town_centre.y).argmin())
+            action = ("Place Bomb", (int(simulation.units.x[i]), int(simulation.units.y[i])))
+        resources = simulation.resources
+        simulation.apply_action(action)
+        if simulation.resources < resources:
+            # Bought; move on to the next purchase
+            if self.opening:
+                self.opening.pop(0)
+            else:
+                self.next = (self.next + 1) % len(self.cycle)
+
+def run_session(session):
+    # One headless game. Returns a result row for the table.
+    strategy, seed, params, max_ticks, starting_resources = session
+    simulation = Simulation(seed=seed)
+    simulation.resources = starting_resources
+    tables = balance_tables(simulation)
+    for name, value in params.items():
+        table, key = name.split(".", 1)
+        if key not in tables[table]:
+            raise KeyError(f"{name} is not a balance parameter")  # Would be added and never read
+        tables[table][key] = value
+    bot = Bot(simulation, strategy)
+
+    earned = 0
+    peak_units = 0
+    start = time.perf_counter()
+    for tick in range(max_ticks):
+        if tick % DECISION_INTERVAL == 0:
+            bot.act()
+        simulation.tick()
+        earned += simulation.reward
+        peak_units = max(peak_units, len(simulation.units))
+        if simulation.game_over:
+            break
+    minutes = simulation.clock.time / 60000
+
+    row = {"strategy": strategy, "seed": seed}
+    row.update(params)
+    row.update({
+        "survival_s": round(simulation.clock.time / 1000, 1),
+        "survived": not simulation.game_over,
+        "level": simulation.level_manager.level,
+        "resources_per_min": round(earned / minutes, 1) if minutes else 0,
+        "peak_units": peak_units,
+        "wall_s": round(time.perf_counter() - start, 2),
+    })
+    return row
+
+def silence_worker():
+    # Every upgrade prints; keep worker output off the terminal
+    sys.stdout = open(os.devnull, "w")
+
+def parse_values(text):
+    values = []
+    for value in text.split(","):
+        number = float(value)
+        values.append(int(number) if number.is_integer() else number)
+    return values
+
+def check_parameter(parser, name):
+    # A key missing from its table would be added to it and never read, so
+    # the sweep would silently repeat the same game
+    table, _, key = name.partition(".")
+    if table not in BALANCE_KEYS:
+        parser.error(f"unknown balance table in {name!r}; use cost.<action>, laser.<stat> or ship.<stat>")
+    if key not in BALANCE_KEYS[table]:
+        parser.error(f"unknown balance parameter {name!r}; {table} keys are: " + ", ".join(BALANCE_KEYS[table]))
+
+def build_sessions(args, parser):
+    # Every combination of strategy, parameter values and seed
+    names = []
+    choices = []
+    for spec in args.vary:
+        if "=" not in spec:
+            parser.error(f"--vary {spec!r} needs values, e.g. laser.laser_damage=5,10")
+        name, values = spec.split("=", 1)
+        check_parameter(parser, name)
+        names.append(name)
+        choices.append(parse_values(values))
+    max_ticks = int(args.minutes * 60 * 60)
+    sessions = []
+    for strategy in args.strategies:
+        for combination in itertools.product(*choices):
+            params = dict(zip(names, combination))
+            for seed in range(args.seed, args.seed + args.seeds):
+                sessions.append((strategy, seed, params, max_ticks, args.resources))
+    return sessions, names
+
+def summarise(rows, names):
+    # Mean of every metric per strategy and parameter combination
+    groups = {}
+    for row in rows:
+        key = (row["strategy"],) + tuple(row[name] for name in names)
+        groups.setdefault(key, []).append(row)
+    print(f"{'strategy':<10} " + " ".join(f"{name:>22}" for name in names)
+          + f" {'survival_s':>10} {'survived':>8} {'level':>6} {'res/min':>9} {'peak':>6}")
+    for key, group in sorted(groups.items(), key=lambda item: str(item[0])):
+        n = len(group)
+        print(f"{key[0]:<10} " + " ".join(f"{value:>22}" for value in key[1:])
+              + f" {sum(r['survival_s'] for r in group) / n:>10.1f}"
+              + f" {sum(r['survived'] for r in group) / n:>8.0%}"
+              + f" {sum(r['level'] for r in group) / n:>6.1f}"
+              + f" {sum(r['resources_per_min'] for r in group) / n:>9.1f}"
+              + f" {max(r['peak_units'] for r in group):>6}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless games in parallel to compare balance settings")
+    parser.add_argument("--strategies", nargs="+", default=sorted(STRATEGIES), choices=sorted(STRATEGIES))
+    parser.add_argument("--vary", action="append", default=[], metavar="TABLE.KEY=V1,V2",
+                        help='balance values to sweep, e.g. laser.laser_damage=5,10 or "cost.Spawn Spaceship=150,200"')
+    parser.add_argument("--seeds", type=int, default=4, help="games per combination")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--minutes", type=float, default=10, help="game minutes before a session is stopped")
+    parser.add_argument("--resources", type=int, default=0, help="starting resources")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args()
+
+    sessions, names = build_sessions(args, parser)
+    fields = ["strategy", "seed", *names, "survival_s", "survived", "level", "resources_per_min", "peak_units", "wall_s"]
+    print(f"Sweep - {len(sessions)} sessions on {args.workers} workers")
+    start = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=silence_worker) as executor, \
+            open(args.output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        futures = [executor.submit(run_session, session) for session in sessions]
+        for done, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            writer.writerow(row)
+            rows.append(row)
+            if done % max(1, len(sessions) // 20) == 0 or done == len(sessions):
+                print(f"Sweep - {done}/{len(sessions)} sessions, {time.perf_counter() - start:.0f}s")
+
+    summarise(rows, names)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+import pygame
+
+TEXT_CACHE_SIZE = 256  # Rendered strings kept before evicting
+ATLAS_CHARS = "0123456789/-.,"  # Glyphs pre-rendered for counters
+
+class GlyphAtlas:
+    # Single characters rendered once for one font and colour. Numbers that
+    # change every frame are drawn by blitting one cached glyph per character
+    # instead of rendering a new string.
+    def __init__(self, font, color, chars=ATLAS_CHARS):
+        self.font = font
+        self.color = color
+        self.glyphs = {}
+        for char in chars:
+            self.add(char)
+
+    def add(self, char):
+        glyph = self.font.render(char, True, self.color)
+        self.glyphs[char] = glyph
+        return glyph
+
+    def draw(self, screen, text, pos):
+        # Returns the x position just past the last glyph
+        x, y = pos
+        glyphs = self.glyphs
+        for char in text:
+            glyph = glyphs.get(char) or self.add(char)
+            screen.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return x
+
+class TextCache:
+    # Rendered text surfaces keyed by (font, text, colour), with the least
+    # recently used dropped once max_entries is reached
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.atlases = {}  # (font, colour) -> GlyphAtlas
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def atlas(self, font, color):
+        key = (font, color)
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            atlas = self.atlases[key] = GlyphAtlas(font, color)
+        return atlas
+
+    def draw_counter(self, screen, font, label, value, color, pos):
+        # A fixed label from the cache followed by a value made of glyphs.
+        # Returns the rectangle drawn to.
+        surface = self.render(font, label, color)
+        screen.blit(surface, pos)
+        end = self.atlas(font, color).draw(screen, str(value), (pos[0] + surface.get_width(), pos[1]))
+        return pygame.Rect(pos[0], pos[1], end - pos[0], surface.get_height())
+
+text_cache = TextCache()  # Shared by everything that draws text
@@ -1,10 +1,17 @@
 import pygame
 import math
+import numpy as np
+from surfacepool import surface_pool
+
+# Added to each laser stat per upgrade; the cooldown is reduced instead
+LASER_UPGRADE_STEPS = {"laser_damage": 5, "laser_cooldown": 100, "laser_range": 2}
 
 class TownCentre:
-    def __init__(self, x, y):
+    def __init__(self, x, y, clock, scheduler):
         self.x = x
         self.y = y
+        self.clock = clock  # Shared simulation clock
+        self.scheduler = scheduler  # Cooldowns and timed effects fire from here
         self.radius = 50
         self.health = 1000
         self.max_health = 1000
@@ -20,6 +27,9 @@ class TownCentre:
         self.laser_target = None
         self.laser_line = None
         self.laser_level = 1
+        self.laser_ready = False
+        self.laser_upgrade_steps = dict(LASER_UPGRADE_STEPS)
+        scheduler.schedule(self.laser_cooldown, self.reload_laser)
 
         # Bomb attack properties
         self.bomb_damage_amount = 50
@@ -33,6 +43,8 @@ class TownCentre:
         self.explosion = None
         self.explosion_duration = 1000  # 1 second in milliseconds
         self.explosion_start_time = 0
+        self.bomb_event = None
+        self.explosion_event = None
         self.bomb_cost = 5
         self.bomb_upgrade_level = 1
 
@@ -45,33 +57,50 @@ class TownCentre:
         # Health regeneration properties
         self.health_upgrade_level = 0
         self.health_regen = 0
-        self.last_regen_time = pygame.time.get_ticks()
+        self.regen_interval = 2000  # 2 seconds
 
-    def update(self, units, current_time):
-        self.laser_attack(units, current_time)
-        self.update_bomb(current_time)
-        self.update_explosion(current_time)
-        self.bomb_damage(units)
+        # Cached drawing of the static parts, see draw()
+        self.body = None
+        self.body_key = None
 
+    def restore_schedule(self):
+        # Re-register pending timers after the state has been loaded
+        if not self.laser_ready:
+            self.scheduler.schedule_at(self.last_laser_time + self.laser_cooldown, self.reload_laser)
+        if self.bomb:
+            self.bomb_event = self.scheduler.schedule_at(self.bomb_timer + self.bomb_duration, self.explode_bomb)
+        if self.explosion:
+            self.explosion_event = self.scheduler.schedule_at(self.explosion_start_time + self.explosion_duration, self.end_explosion)
         if self.health_regen > 0:
-            if current_time - self.last_regen_time >= 2000:  # 2 seconds
-                self.health = min(self.health + self.health_regen, self.max_health)
-                self.last_regen_time = current_time
-
-    def laser_attack(self, units, current_time):
-        if current_time - self.last_laser_time >= self.laser_cooldown:
-            closest_unit = min(units, key=lambda u: math.hypot(u.x - self.x, u.y - self.y), default=None)
-            if closest_unit and math.hypot(closest_unit.x - self.x, closest_unit.y - self.y) <= self.laser_range:
-                closest_unit.take_damage(self.laser_damage)
-                self.laser_target = closest_unit
-                self.laser_line = ((self.x, self.y), (closest_unit.x, closest_unit.y))
-                self.last_laser_time = current_time
-            else:
-                self.laser_target = None
+            self.scheduler.schedule(self.regen_interval, self.regenerate)
+
+    def regenerate(self):
+        self.health = min(self.health + self.health_regen, self.max_health)
+        self.scheduler.schedule(self.regen_interval, self.regenerate)
+
+    def reload_laser(self):
+        self.laser_ready = True
+
+    def clear_laser(self):
+        self.laser_line = None
+
+    def acquire_target(self, units, current_time):
+        # Pick this tick's laser target (a unit slot) if the laser is ready
+        self.laser_target = None
+        if self.laser_ready:
+            self.laser_target = units.spatial_grid().nearest(self.x, self.y, self.laser_range)
+            if self.laser_target is None:
                 self.laser_line = None
-        elif current_time - self.last_laser_time >= 100:  # Clear laser after 100ms
-            self.laser_target = None
-            self.laser_line = None
+
+    def deal_damage(self, units, current_time):
+        if self.laser_target is not None:
+            units.take_damage(self.laser_target, self.laser_damage)
+            self.laser_line = ((self.x, self.y), (units.x[self.laser_target], units.y[self.laser_target]))
+            self.last_laser_time = current_time
+            self.laser_ready = False
+            self.scheduler.schedule(self.laser_cooldown, self.reload_laser)
+            self.scheduler.schedule(100, self.clear_laser)  # Clear laser after 100ms
+        self.bomb_damage(units)
 
     def upgrade_health(self):
         self.health_upgrade_level += 1
@@ -80,14 +109,17 @@ class TownCentre:
         
         if self.health_upgrade_level % 3 == 0:
             self.health_regen += 1
+            if self.health_regen == 1:
+                self.scheduler.schedule(self.regen_interval, self.regenerate)
 
         return self.health_regen
 
     def upgrade_laser(self):
         self.laser_level += 1
-        self.laser_damage += 5
-        self.laser_cooldown = max(100, self.laser_cooldown - 100)  # Minimum cooldown of 100ms
-        self.laser_range += 2  # Increase range by 2 each level
+        steps = self.laser_upgrade_steps
+        self.laser_damage += steps["laser_damage"]
+        self.laser_cooldown = max(100, self.laser_cooldown - steps["laser_cooldown"])  # Minimum cooldown of 100ms
+        self.laser_range += steps["laser_range"]
         
         print(f"Laser Upgraded - Level: {self.laser_level}, Damage: {self.laser_damage}, Frequency: {1000/self.laser_cooldown:.2f} shots/second, Range: {self.laser_range}")
 
@@ -97,28 +129,28 @@ class TownCentre:
             self.health = 0
 
     def place_bomb(self, x, y):
+        # A new bomb replaces one that has not gone off yet
         self.bomb = (x, y)
-        self.bomb_timer = pygame.time.get_ticks()
-
-    def update_bomb(self, current_time):
-        if self.bomb and current_time - self.bomb_timer >= self.bomb_duration:
-            self.explode_bomb()
+        self.bomb_timer = self.clock.time
+        self.scheduler.cancel(self.bomb_event)
+        self.bomb_event = self.scheduler.schedule(self.bomb_duration, self.explode_bomb)
 
     def explode_bomb(self):
         self.explosion = self.bomb
-        self.explosion_start_time = pygame.time.get_ticks()
+        self.explosion_start_time = self.clock.time
         self.bomb = None
+        self.bomb_event = None
+        self.scheduler.cancel(self.explosion_event)
+        self.explosion_event = self.scheduler.schedule(self.explosion_duration, self.end_explosion)
 
-    def update_explosion(self, current_time):
-        if self.explosion and current_time - self.explosion_start_time >= self.explosion_duration:
-            self.explosion = None
+    def end_explosion(self):
+        self.explosion = None
+        self.explosion_event = None
 
     def bomb_damage(self, units):
-        if self.explosion:
-            for unit in units:
-                distance = math.hypot(unit.x - self.explosion[0], unit.y - self.explosion[1])
-                if distance <= self.bomb_radius:
-                    unit.take_damage(self.bomb_damage_amount)
+        if self.explosion and len(units):
+            in_blast = units.spatial_grid().query_radius(*self.explosion, self.bomb_radius)
+            units.take_damage(in_blast, self.bomb_damage_amount)
 
     def upgrade_bomb(self):
         self.bomb_upgrade_level += 1
@@ -136,91 +168,135 @@ class TownCentre:
         self.anti_grav_slow = max(0.1, self.anti_grav_slow - 0.1)  # Minimum 10% speed (90% slow)
         print(f"AntiGrav Upgraded - Level: {self.anti_grav_level}, Slow: {self.anti_grav_slow*100:.1f}%, Radius: {self.anti_grav_radius}")
 
-    def apply_anti_grav(self, unit):
+    def apply_anti_grav(self, units):
+        # Speed factor for every unit: slowed inside the field, 1.0 elsewhere
+        if not self.anti_grav_active:
+            return None
+        factors = np.ones(len(units))
+        factors[units.spatial_grid().query_radius(self.x, self.y, self.anti_grav_radius)] = self.anti_grav_slow
+        return factors
+
+    def build_body(self):
+        # Everything that only changes with the anti-grav field, drawn once
+        # into a surface centred on the town centre
+        extent = int(self.radius * 1.5)
         if self.anti_grav_active:
-            distance = math.hypot(unit.x - self.x, unit.y - self.y)
-            if distance <= self.anti_grav_radius:
-                return self.anti_grav_slow
-        return 1.0
+            extent = max(extent, self.anti_grav_radius)
+        body = pygame.Surface((extent * 2, extent * 2), pygame.SRCALPHA)
+        x = y = extent
 
-    def draw(self, screen):
         # Draw anti-grav field if active
         if self.anti_grav_active:
-            anti_grav_surface = pygame.Surface((self.anti_grav_radius * 2, self.anti_grav_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(anti_grav_surface, (0, 100, 255, 30), (self.anti_grav_radius, self.anti_grav_radius), self.anti_grav_radius)
-            screen.blit(anti_grav_surface, (self.x - self.anti_grav_radius, self.y - self.anti_grav_radius))
+            pygame.draw.circle(body, (0, 100, 255, 30), (x, y), self.anti_grav_radius)
 
         # Main central structure
         # Base structure
-        pygame.draw.polygon(screen, self.base_color, [
-            (self.x - self.radius // 3, self.y - self.radius),
-            (self.x + self.radius // 3, self.y - self.radius),
-            (self.x + self.radius // 4, self.y + self.radius),
-            (self.x - self.radius // 4, self.y + self.radius)
+        pygame.draw.polygon(body, self.base_color, [
+            (x - self.radius // 3, y - self.radius),
+            (x + self.radius // 3, y - self.radius),
+            (x + self.radius // 4, y + self.radius),
+            (x - self.radius // 4, y + self.radius)
         ])
         
         # Angled details
-        pygame.draw.line(screen, self.highlight_color, (self.x - self.radius // 3, self.y - self.radius), (self.x - self.radius // 4, self.y + self.radius), 2)
-        pygame.draw.line(screen, self.shadow_color, (self.x + self.radius // 3, self.y - self.radius), (self.x + self.radius // 4, self.y + self.radius), 2)
+        pygame.draw.line(body, self.highlight_color, (x - self.radius // 3, y - self.radius), (x - self.radius // 4, y + self.radius), 2)
+        pygame.draw.line(body, self.shadow_color, (x + self.radius // 3, y - self.radius), (x + self.radius // 4, y + self.radius), 2)
         
         # Horizontal lines for a more technological look
         for i in range(1, 6):
-            y = self.y - self.radius + (self.radius * 2 // 5) * i
-            pygame.draw.line(screen, self.highlight_color, (self.x - self.radius // 3, y), (self.x + self.radius // 3, y), 1)
+            line_y = y - self.radius + (self.radius * 2 // 5) * i
+            pygame.draw.line(body, self.highlight_color, (x - self.radius // 3, line_y), (x + self.radius // 3, line_y), 1)
         
         # Additional angled details
-        pygame.draw.line(screen, self.shadow_color, (self.x - self.radius // 6, self.y - self.radius), (self.x, self.y + self.radius // 2), 2)
-        pygame.draw.line(screen, self.highlight_color, (self.x + self.radius // 6, self.y - self.radius), (self.x, self.y + self.radius // 2), 2)
+        pygame.draw.line(body, self.shadow_color, (x - self.radius // 6, y - self.radius), (x, y + self.radius // 2), 2)
+        pygame.draw.line(body, self.highlight_color, (x + self.radius // 6, y - self.radius), (x, y + self.radius // 2), 2)
         
         # Top dome
-        pygame.draw.ellipse(screen, self.highlight_color, (self.x - self.radius // 3, self.y - self.radius * 1.2, self.radius * 2 // 3, self.radius // 2))
+        pygame.draw.ellipse(body, self.highlight_color, (x - self.radius // 3, y - self.radius * 1.2, self.radius * 2 // 3, self.radius // 2))
         
         # Rotating rings
         for i in range(3):
             y_offset = self.radius * 0.5 * i
-            pygame.draw.ellipse(screen, self.base_color, (self.x - self.radius, self.y - self.radius // 4 + y_offset, self.radius * 2, self.radius // 2), 4)
-            pygame.draw.arc(screen, self.highlight_color, (self.x - self.radius, self.y - self.radius // 4 + y_offset, self.radius * 2, self.radius // 2), math.pi, 2*math.pi, 2)
-            pygame.draw.arc(screen, self.shadow_color, (self.x - self.radius, self.y - self.radius // 4 + y_offset, self.radius * 2, self.radius // 2), 0, math.pi, 2)
+            pygame.draw.ellipse(body, self.base_color, (x - self.radius, y - self.radius // 4 + y_offset, self.radius * 2, self.radius // 2), 4)
+            pygame.draw.arc(body, self.highlight_color, (x - self.radius, y - self.radius // 4 + y_offset, self.radius * 2, self.radius // 2), math.pi, 2*math.pi, 2)
+            pygame.draw.arc(body, self.shadow_color, (x - self.radius, y - self.radius // 4 + y_offset, self.radius * 2, self.radius // 2), 0, math.pi, 2)
         
         # Side structures
         for angle in [30, 150, 210, 330]:
-            x = self.x + int(math.cos(math.radians(angle)) * self.radius * 0.8)
-            y = self.y + int(math.sin(math.radians(angle)) * self.radius * 0.8)
-            pygame.draw.rect(screen, self.base_color, (x - 5, y - 15, 10, 30))
-            pygame.draw.line(screen, self.highlight_color, (x - 5, y - 15), (x - 5, y + 15), 2)
-            pygame.draw.line(screen, self.shadow_color, (x + 5, y - 15), (x + 5, y + 15), 2)
+            side_x = x + int(math.cos(math.radians(angle)) * self.radius * 0.8)
+            side_y = y + int(math.sin(math.radians(angle)) * self.radius * 0.8)
+            pygame.draw.rect(body, self.base_color, (side_x - 5, side_y - 15, 10, 30))
+            pygame.draw.line(body, self.highlight_color, (side_x - 5, side_y - 15), (side_x - 5, side_y + 15), 2)
+            pygame.draw.line(body, self.shadow_color, (side_x + 5, side_y - 15), (side_x + 5, side_y + 15), 2)
         
         
         # Energy core
         core_radius = self.radius // 4
         core_surface = pygame.Surface((core_radius * 2, core_radius * 2), pygame.SRCALPHA)
         pygame.draw.circle(core_surface, (200, 230, 255, 100), (core_radius, core_radius), core_radius)
-        screen.blit(core_surface, (self.x - core_radius, self.y - core_radius))
-        
+        body.blit(core_surface, (x - core_radius, y - core_radius))
+
+        if pygame.display.get_surface() is not None:
+            body = body.convert_alpha()
+        return body
+
+    def warm(self):
+        # Builds the body and the explosion ahead of the first draw, one per step
+        body_key = (self.anti_grav_active, self.anti_grav_radius)
+        if self.body_key != body_key:
+            self.body = self.build_body()
+            self.body_key = body_key
+        yield
+        surface_pool.circle(self.bomb_radius, (255, 165, 0))
+        surface_pool.fade_ramp(self.explosion_duration)
+        yield
+
+    def draw(self, screen):
+        # The body is cached and rebuilt when the anti-grav field changes;
+        # only the pulse, health bar and laser are drawn every frame. Returns
+        # the rectangles that changed.
+        dirty = []
+        body_key = (self.anti_grav_active, self.anti_grav_radius)
+        rebuilt = self.body_key != body_key
+        if rebuilt:
+            self.body = self.build_body()
+            self.body_key = body_key
+        extent = self.body.get_width() // 2
+        body_rect = screen.blit(self.body, (self.x - extent, self.y - extent))
+        if rebuilt:
+            dirty.append(body_rect)
+
         # Pulsating energy effect
-        pulse = (math.sin(pygame.time.get_ticks() * 0.01) + 1) * 0.5
+        core_radius = self.radius // 4
+        pulse = (math.sin(self.clock.time * 0.01) + 1) * 0.5
         pulse_radius = int(core_radius + pulse * 5)
-        pygame.draw.circle(screen, (200, 230, 255, 50), (self.x, self.y), pulse_radius, 2)
+        dirty.append(pygame.draw.circle(screen, (200, 230, 255, 50), (self.x, self.y), pulse_radius, 2))
 
         # Draw health bar
         health_bar_width = 100
         health_bar_height = 2
         health_ratio = self.health / self.max_health
-        pygame.draw.rect(screen, (255, 0, 0), (self.x - health_bar_width // 2, self.y + self.radius + 10, health_bar_width, health_bar_height))
+        dirty.append(pygame.draw.rect(screen, (255, 0, 0), (self.x - health_bar_width // 2, self.y + self.radius + 10, health_bar_width, health_bar_height)))
         pygame.draw.rect(screen, (0, 255, 0), (self.x - health_bar_width // 2, self.y + self.radius + 10, int(health_bar_width * health_ratio), health_bar_height))
 
         # Draw laser if active
         if self.laser_line:
-            pygame.draw.line(screen, (255, 0, 0), self.laser_line[0], self.laser_line[1], 2)
+            dirty.append(pygame.draw.line(screen, (255, 0, 0), self.laser_line[0], self.laser_line[1], 2))
+        return dirty
 
     def draw_bomb_and_explosion(self, screen):
+        # Returns the rectangles drawn to
+        dirty = []
+
         # Draw bomb
         if self.bomb:
-            pygame.draw.circle(screen, (255, 0, 0), self.bomb, self.bomb_size)
+            dirty.append(pygame.draw.circle(screen, (255, 0, 0), self.bomb, self.bomb_size))
         
         # Draw explosion
         if self.explosion:
-            explosion_alpha = max(0, 255 - (pygame.time.get_ticks() - self.explosion_start_time) / self.explosion_duration * 255)
-            explosion_surface = pygame.Surface((self.bomb_radius * 2, self.bomb_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(explosion_surface, (255, 165, 0, int(explosion_alpha)), (self.bomb_radius, self.bomb_radius), self.bomb_radius)
-            screen.blit(explosion_surface, (self.explosion[0] - self.bomb_radius, self.explosion[1] - self.bomb_radius))
+            # One pre-drawn circle per bomb radius, faded with a precomputed alpha ramp
+            elapsed = min(self.clock.time - self.explosion_start_time, self.explosion_duration)
+            explosion_surface = surface_pool.circle(self.bomb_radius, (255, 165, 0))
+            explosion_surface.set_alpha(surface_pool.fade_ramp(self.explosion_duration)[elapsed])
+            dirty.append(screen.blit(explosion_surface, (self.explosion[0] - self.bomb_radius, self.explosion[1] - self.bomb_radius)))
+        return dirty
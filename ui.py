@@ -1,14 +1,16 @@
 import pygame
 import math
+from textcache import text_cache
+from surfacepool import surface_pool
+from assets import assets
 
 class UI:
-    def __init__(self, width, height, town_centre):
+    def __init__(self, width, height, simulation):
         self.width = width
         self.height = height
-        self.font = pygame.font.Font(None, 18)  # Reduced from 36 to 18
-        self.resources = 0
-        self.level = 1
-        self.town_centre = town_centre
+        self.font = assets.font(None, 18)  # Reduced from 36 to 18
+        self.simulation = simulation  # Resources, level and upgrades live in the simulation
+        self.town_centre = simulation.town_centre
         self.buttons = [
             Button("Upgrade Laser", 5, 5, 100, 25),    # Reduced size and adjusted position
             Button("Place Bomb", 5, 35, 100, 25),      # Reduced size and adjusted position
@@ -23,40 +25,49 @@ class UI:
             Button("Upgrade Spaceship", 5, 215, 100, 25)
         ])
         self.buttons.append(Button("Upgrade Harvesting", 5, 245, 100, 25))  # Add new button
-        self.harvesting_level = 0  # Track harvesting upgrade level
 
     def draw(self, screen):
-        # Draw resources
-        resource_text = self.font.render(f"Resources: {self.resources}", True, (255, 255, 255))
-        screen.blit(resource_text, (self.width - 110, 5))  # Adjusted position
+        # Returns the rectangles that can change between frames; the buttons
+        # themselves never do
+        dirty = []
 
-        # Draw level
-        level_text = self.font.render(f"Level: {self.level}", True, (255, 255, 255))
-        screen.blit(level_text, (self.width - 110, 25))  # Adjusted position
+        # Counters: cached labels with the numbers composed from glyphs
+        white = (255, 255, 255)
+        dirty.append(text_cache.draw_counter(screen, self.font, "Resources: ", self.simulation.resources, white, (self.width - 110, 5)))  # Adjusted position
+        dirty.append(text_cache.draw_counter(screen, self.font, "Level: ", self.simulation.level_manager.level, white, (self.width - 110, 25)))  # Adjusted position
 
         # Draw town centre health
-        health_text = self.font.render(f"Health: {self.town_centre.health}/{self.town_centre.max_health}", True, (255, 255, 255))
-        screen.blit(health_text, (self.width - 110, 45))  # Position below level
+        health = f"{self.town_centre.health}/{self.town_centre.max_health}"
+        dirty.append(text_cache.draw_counter(screen, self.font, "Health: ", health, white, (self.width - 110, 45)))  # Position below level
 
         # Draw buttons with costs
         for button in self.buttons:
             button.draw(screen)
             cost = self.get_action_cost(button.text)
-            cost_text = self.font.render(f"Cost: {cost}", True, (255, 255, 255))
-            screen.blit(cost_text, (button.rect.right + 5, button.rect.centery - 7))  # Adjusted position
-
-        # Draw new button for Upgrade Harvesting
-        harvesting_button = self.buttons[-1]  # Get the last button (Upgrade Harvesting)
-        harvesting_button.draw(screen)
-        cost_text = self.font.render(f"Cost: 50", True, (255, 255, 255))
-        screen.blit(cost_text, (harvesting_button.rect.right + 5, harvesting_button.rect.centery - 7))
+            cost_text = text_cache.render(self.font, f"Cost: {cost}", white)
+            dirty.append(screen.blit(cost_text, (button.rect.right + 5, button.rect.centery - 7)))  # Adjusted position
 
         # If placing bomb, show cursor
         if self.placing_bomb:
             mouse_pos = pygame.mouse.get_pos()
-            self.draw_missile(screen, mouse_pos, 10, 128)  # Reduced missile size
+            dirty.append(self.draw_missile(screen, mouse_pos, 10, 128))  # Reduced missile size
+        return dirty
+
+    def warm(self):
+        # Renders the labels, counter glyphs and missile cursors ahead of the
+        # first frame by drawing once to a scratch surface
+        scratch = pygame.Surface((self.width, self.height))
+        self.draw(scratch)
+        yield
+        self.draw_missile(scratch, (0, 0), 10, 128)
+        self.draw_missile(scratch, (0, 0), 20, 128)
+        yield
 
     def draw_missile(self, screen, pos, size, alpha):
+        missile_surface = surface_pool.get(("missile", size, alpha), self.render_missile, size, alpha)
+        return screen.blit(missile_surface, (pos[0] - size, pos[1] - size))
+
+    def render_missile(self, size, alpha):
         missile_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
         pygame.draw.polygon(missile_surface, (255, 0, 0, alpha), [
             (size, 0),
@@ -64,33 +75,17 @@ class UI:
             (size, size * 1.5),
             (0, size * 2)
         ])
-        screen.blit(missile_surface, (pos[0] - size, pos[1] - size))
+        return missile_surface
 
     def get_action_cost(self, action):
-        if action == "Upgrade Laser":
-            return 50
-        elif action == "Place Bomb":
+        if action == "Place Bomb":
             return self.town_centre.bomb_cost
-        elif action == "Upgrade Bomb":
-            return 100  # You can adjust this cost as needed
-        elif action == "Upgrade Health":
-            return 100
-        elif action == "Activate AntiGrav":
-            return 50
-        elif action == "Upgrade AntiGrav":
-            return 50
-        elif action == "Spawn Spaceship":
-            return 200
-        elif action == "Upgrade Spaceship":
-            return 100
-        elif action == "Upgrade Harvesting":
-            return 50
-        return 0
+        return self.simulation.action_costs.get(action, 0)  # Prices live in simulation.ACTION_COSTS
 
     def handle_event(self, event):
         if self.placing_bomb and event.type == pygame.MOUSEBUTTONDOWN:
             self.placing_bomb = False
-            if self.resources >= self.town_centre.bomb_cost:
+            if self.simulation.resources >= self.town_centre.bomb_cost:
                 return ("Place Bomb", event.pos)
             else:
                 return "Cannot Afford Bomb"
@@ -98,7 +93,7 @@ class UI:
         for button in self.buttons:
             if button.is_clicked(event):
                 cost = self.get_action_cost(button.text)
-                if self.resources >= cost:
+                if self.simulation.resources >= cost:
                     if button.text == "Upgrade Harvesting":
                         return "Upgrade Harvesting"
                     return button.text
@@ -107,19 +102,6 @@ class UI:
 
         return None
 
-    def update_resources(self, amount):
-        self.resources += amount
-
-    def update_level(self, level):
-        self.level = level
-
-    def upgrade_harvesting(self):
-        if self.resources >= 50:
-            self.resources -= 50
-            self.harvesting_level += 1
-            return True
-        return False
-
     # ... (other methods remain the same)
 
 class Button:
@@ -128,11 +110,11 @@ class Button:
         self.rect = pygame.Rect(x, y, width, height)
         self.color = (100, 100, 100)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.Font(None, 16)  # Reduced from 24 to 16
+        self.font = assets.font(None, 16)  # Reduced from 24 to 16
 
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, self.rect)
-        text_surface = self.font.render(self.text, True, self.text_color)
+        text_surface = text_cache.render(self.font, self.text, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
 
@@ -0,0 +1,329 @@
+import numpy as np
+import pygame
+from spatialgrid import SpatialGrid
+from units import UNIT_TYPES, TRIANGLE, CIRCLE, DIAMOND, STAR, FULL, DOT
+from spritecache import SpriteCache
+from surfacepool import surface_pool
+from drawlist import UNIT_LAYER
+
+# Per-unit columns and their dtypes; every column is indexed by the same slot
+FIELDS = {
+    'x': np.float64,
+    'y': np.float64,
+    'speed': np.float64,
+    'health': np.float64,
+    'damage': np.int64,
+    'value': np.int64,
+    'size': np.float64,
+    'type_id': np.int8,
+    'phase': np.float64,  # Wave phase for diamonds
+    'born': np.int64,  # Clock tick the unit spawned on
+}
+
+# Columns kept alongside FIELDS but left out of saves and checksums
+LOCAL_FIELDS = {
+    'uid': np.int64,  # Never reused, so a unit can be matched across snapshots
+}
+COLUMNS = {**FIELDS, **LOCAL_FIELDS}
+
+SPAWN_BATCH = 256  # Random spawn picks drawn from the RNG at a time
+SPAWN_PADDING = 50  # Distance outside the screen edge where units appear
+DOT_SIZE = 3  # Side of the square drawn per unit at DOT detail
+
+class UnitStore:
+    # Struct-of-arrays storage for every live enemy. Units occupy the slots
+    # [0, count) and all movement is done as whole-array operations.
+    def __init__(self, screen_width, screen_height, target, clock, rng=None, capacity=256):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.target = target
+        self.clock = clock  # Shared simulation clock
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = 0
+        self.capacity = capacity
+        self.next_uid = 0
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+        # Range queries go through a grid rebuilt lazily after units move
+        self.grid = SpatialGrid(screen_width, screen_height)
+        self.grid_dirty = True
+
+        # Slots freed by dead units are recycled in place. Per type we count
+        # spawns that reused a slot (hits), spawns that needed a never-used
+        # slot (misses) and the most units of that type alive at once.
+        self.slots_used = 0
+        self.live_by_type = np.zeros(len(UNIT_TYPES), dtype=np.int64)
+        self.pool_hits = np.zeros(len(UNIT_TYPES), dtype=np.int64)
+        self.pool_misses = np.zeros(len(UNIT_TYPES), dtype=np.int64)
+        self.pool_high_water = np.zeros(len(UNIT_TYPES), dtype=np.int64)
+
+        # Pre-drawn random spawn types and edge positions
+        self.spawn_types = []
+        self.spawn_x = []
+        self.spawn_y = []
+        self.spawn_cursor = 0
+
+        # Per-type stat tables, indexed by type ID
+        self.type_speed = np.array([t.start_speed for t in UNIT_TYPES], dtype=np.float64)
+        self.type_health = np.array([t.health for t in UNIT_TYPES], dtype=np.float64)
+        self.type_damage = np.array([t.damage for t in UNIT_TYPES], dtype=np.int64)
+        self.type_value = np.array([t.value for t in UNIT_TYPES], dtype=np.int64)
+        self.type_size = np.array([t.size for t in UNIT_TYPES], dtype=np.float64)
+
+        self.sprites = None  # Rotated sprite cache, created on first use
+
+    def __len__(self):
+        return self.count
+
+    def grow(self):
+        self.capacity *= 2
+        for name in COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+
+    def reserve(self, capacity):
+        # Pre-size the arrays ahead of a spawn-heavy phase
+        while self.capacity < capacity:
+            self.grow()
+
+    def refill_spawns(self):
+        # Draw a batch of random types and screen-edge entry points at once
+        width = self.screen_width
+        height = self.screen_height
+        types = self.rng.integers(len(UNIT_TYPES), size=SPAWN_BATCH)
+        sides = self.rng.integers(4, size=SPAWN_BATCH)  # top, right, bottom, left
+        along_x = self.rng.integers(0, width + 1, size=SPAWN_BATCH)
+        along_y = self.rng.integers(0, height + 1, size=SPAWN_BATCH)
+        x = np.select([sides == 0, sides == 1, sides == 2], [along_x, width + SPAWN_PADDING, along_x], -SPAWN_PADDING)
+        y = np.select([sides == 0, sides == 1, sides == 2], [-SPAWN_PADDING, along_y, height + SPAWN_PADDING], along_y)
+        self.spawn_types = types.tolist()
+        self.spawn_x = x.tolist()
+        self.spawn_y = y.tolist()
+        self.spawn_cursor = 0
+
+    def spawn(self, type_id=None):
+        # Spawn at a random screen edge; a random type unless one is given
+        if self.spawn_cursor == len(self.spawn_types):
+            self.refill_spawns()
+        pick = self.spawn_cursor
+        self.spawn_cursor += 1
+        if type_id is None:
+            type_id = self.spawn_types[pick]
+
+        if self.count == self.capacity:
+            self.grow()
+        i = self.count
+        self.count += 1
+        self.grid_dirty = True
+
+        # Reset the slot in place from the type tables
+        if i < self.slots_used:
+            self.pool_hits[type_id] += 1
+        else:
+            self.pool_misses[type_id] += 1
+            self.slots_used = self.count
+        self.live_by_type[type_id] += 1
+        if self.live_by_type[type_id] > self.pool_high_water[type_id]:
+            self.pool_high_water[type_id] = self.live_by_type[type_id]
+
+        self.x[i] = self.spawn_x[pick]
+        self.y[i] = self.spawn_y[pick]
+        self.type_id[i] = type_id
+        self.speed[i] = self.type_speed[type_id]
+        self.health[i] = self.type_health[type_id]
+        self.damage[i] = self.type_damage[type_id]
+        self.value[i] = self.type_value[type_id]
+        self.size[i] = self.type_size[type_id]
+        self.phase[i] = 0
+        self.born[i] = self.clock.ticks
+        self.uid[i] = self.next_uid
+        self.next_uid += 1
+        return i
+
+    def renumber(self):
+        # Give every live unit a fresh uid, after the columns were filled in directly
+        self.uid[:self.count] = np.arange(self.count)
+        self.next_uid = self.count
+
+    def pool_stats(self):
+        return {
+            type(unit_type).__name__: {
+                'hits': int(self.pool_hits[t]),
+                'misses': int(self.pool_misses[t]),
+                'high_water': int(self.pool_high_water[t]),
+            }
+            for t, unit_type in enumerate(UNIT_TYPES)
+        }
+
+    def directions(self, x, y):
+        # Unit vectors from each position towards the target
+        dx = self.target.x - x
+        dy = self.target.y - y
+        dist = np.hypot(dx, dy)
+        dist[dist == 0] = 1
+        return dx / dist, dy / dist
+
+    def spatial_grid(self):
+        if self.grid_dirty:
+            self.grid.rebuild(self.x[:self.count], self.y[:self.count])
+            self.grid_dirty = False
+        return self.grid
+
+    def distances_to(self, x, y):
+        n = self.count
+        return np.hypot(self.x[:n] - x, self.y[:n] - y)
+
+    def update(self, slow_factors=None):
+        n = self.count
+        if n == 0:
+            return
+        self.grid_dirty = True
+        x = self.x[:n]
+        y = self.y[:n]
+        type_id = self.type_id[:n]
+        speed = self.speed[:n]
+        if slow_factors is not None:
+            speed = speed * slow_factors
+
+        # Move every unit straight towards the target
+        cos, sin = self.directions(x, y)
+        x += cos * speed
+        y += sin * speed
+
+        # Triangles: shared wobble driven by game time
+        triangles = type_id == TRIANGLE
+        if triangles.any():
+            wobble = UNIT_TYPES[TRIANGLE].wobble
+            t = self.clock.time * 0.01
+            x[triangles] += np.sin(t) * wobble
+            y[triangles] += np.cos(t) * wobble
+
+        # Diamonds: serpentine sideways sway perpendicular to their heading
+        diamonds = np.flatnonzero(type_id == DIAMOND)
+        if diamonds.size:
+            diamond = UNIT_TYPES[DIAMOND]
+            old_phase = self.phase[diamonds]
+            phase = old_phase + diamond.wave_speed
+            self.phase[diamonds] = phase
+            cos, sin = self.directions(x[diamonds], y[diamonds])
+            sway = (np.sin(phase) - np.sin(old_phase)) * diamond.wave_amplitude
+            x[diamonds] -= sin * sway
+            y[diamonds] += cos * sway
+
+        # Stars: occasional burst towards the target
+        stars = np.flatnonzero(type_id == STAR)
+        if stars.size:
+            star = UNIT_TYPES[STAR]
+            bursting = stars[self.rng.random(stars.size) < star.burst_chance]
+            if bursting.size:
+                cos, sin = self.directions(x[bursting], y[bursting])
+                burst_speed = star.base_speed * star.burst_multiplier
+                x[bursting] += cos * burst_speed
+                y[bursting] += sin * burst_speed
+
+    def beam_active(self):
+        # Circle beams toggle every beam_interval ticks after spawning. Derived
+        # from the spawn tick when drawing, so no per-tick timer is kept.
+        n = self.count
+        if not UNIT_TYPES[CIRCLE].has_beam:
+            return np.zeros(n, dtype=bool)
+        age = self.clock.ticks - self.born[:n] + 1
+        return (age // UNIT_TYPES[CIRCLE].beam_interval) % 2 == 1
+
+    def collides_with(self, other):
+        return self.distances_to(other.x, other.y) < (self.size[:self.count] + other.radius)
+
+    def take_damage(self, index, damage):
+        # index is a slot or a mask over the live units
+        self.health[:self.count][index] -= damage
+
+    def remove(self, slots):
+        # Swap-remove: the last live units move into the freed slots, so the
+        # cost depends on how many units are removed, not on how many exist
+        n = self.count
+        kept = n - slots.size
+        holes = slots[slots < kept]
+        tail = np.ones(n - kept, dtype=bool)
+        tail[slots[slots >= kept] - kept] = False
+        fillers = kept + np.flatnonzero(tail)
+        self.live_by_type -= np.bincount(self.type_id[slots], minlength=len(UNIT_TYPES))
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[holes] = column[fillers]
+        self.count = kept
+        self.grid_dirty = True
+
+    def resolve(self, target):
+        # End-of-tick lifecycle pass. Units that reached the target or ran out
+        # of health are tallied and removed together.
+        # Returns (units removed, resources earned, damage dealt to the target).
+        n = self.count
+        if n == 0:
+            return 0, 0, 0
+        collided = self.collides_with(target)
+        dead = np.flatnonzero(collided | (self.health[:n] <= 0))
+        if dead.size == 0:
+            return 0, 0, 0
+        damage = int(self.damage[:n][collided].sum())
+        reward = int(self.value[dead].sum())
+        self.remove(dead)
+        return int(dead.size), reward, damage
+
+    def sprite_cache(self):
+        if self.sprites is None:
+            self.sprites = SpriteCache()
+        return self.sprites
+
+    def warm(self):
+        # Renders every unit sprite ahead of time, one per step
+        yield from self.sprite_cache().warm()
+        for unit_type in UNIT_TYPES:
+            dot_sprite(unit_type.color)
+            yield
+
+    def emit_state(self, draw_list, x, y, type_id, beams, detail=FULL):
+        # Adds one blit per unit to the draw list, grouped by sprite, for units
+        # given as arrays, as in a published snapshot. Sprites
+        # come from the sprite cache, built on the first draw, or are small
+        # squares at DOT detail. Each distinct sprite is looked up once.
+        n = len(x)
+        if n == 0:
+            return
+        if detail == DOT:
+            keys = type_id.astype(np.intp)
+        else:
+            self.sprite_cache()
+            headings = np.arctan2(self.target.y - y, self.target.x - x)
+            angle_steps = self.sprites.angle_indices(headings)
+            keys = (type_id.astype(np.intp) * self.sprites.angle_steps + angle_steps) * 2 + beams
+        unique_keys, sprite_of = np.unique(keys, return_inverse=True)
+
+        surfaces = []
+        offsets = np.empty((unique_keys.size, 2), dtype=np.intp)
+        for i, key in enumerate(unique_keys.tolist()):
+            if detail == DOT:
+                surface = dot_sprite(UNIT_TYPES[key].color)
+                offset = (DOT_SIZE // 2, DOT_SIZE // 2)
+            else:
+                type_and_angle, beam = divmod(key, 2)
+                type_id, angle_step = divmod(type_and_angle, self.sprites.angle_steps)
+                surface, offset = self.sprites.get(type_id, angle_step, bool(beam), detail)
+            surfaces.append(surface)
+            offsets[i] = offset
+
+        order = np.argsort(sprite_of, kind="stable")
+        sprite_of = sprite_of[order]
+        xs = (x[order].astype(np.intp) - offsets[sprite_of, 0]).tolist()
+        ys = (y[order].astype(np.intp) - offsets[sprite_of, 1]).tolist()
+        draw_list.extend(UNIT_LAYER, zip([surfaces[i] for i in sprite_of.tolist()], zip(xs, ys)))
+
+def dot_sprite(color):
+    return surface_pool.get(("dot", DOT_SIZE, color), render_dot, color)
+
+def render_dot(color):
+    dot = pygame.Surface((DOT_SIZE, DOT_SIZE))
+    dot.fill(color)
+    return dot